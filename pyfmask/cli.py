@@ -86,6 +86,12 @@ def app():
         type=int,
         default=4,
     )
+    parser.add_argument(
+        "--nodata_value",
+        help="Value for no data in fmask result array, default 255",
+        type=int,
+        default=255,
+    )
     parser.add_argument(
         "--use_mapzen",
         help="Bool to use Mapzen WMS DEM mapping, default True",
@@ -127,6 +133,7 @@ def app():
         snow_value=args.snow_value,
         cloud_shadow_value=args.cloud_shadow_value,
         cloud_value=args.cloud_value,
+        nodata_value=args.nodata_value,
         use_mapzen=args.use_mapzen,
         delete_temp_dir=args.delete_temp_dir,
         save_cloud_prob=args.save_cloud_prob,
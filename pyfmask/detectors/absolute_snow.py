@@ -36,7 +36,7 @@ def detect_absolute_snow(
         green * green, window_size, mode="constant", cval=0
     )
 
-    mask: np.ndarray = np.where(green != 0, 1, 0)
+    mask: np.ndarray = green != 0
     weight: np.ndarray = uniform_filter(
         mask.astype(np.float32), window_size, mode="constant", cval=0
     )
@@ -45,7 +45,7 @@ def detect_absolute_snow(
     array_2 = np.where(weight > 0, array_2 / (weight + 1e-7), 0)
 
     scsi: np.ndarray = array_2 - array_1 * array_1
-    scsi[(scsi <= 0) | (mask == 0)] = 0
+    scsi[(scsi <= 0) | ~mask] = 0
     scsi = np.sqrt(scsi)
 
     scsi = scsi * (1 - ndsi)
@@ -53,5 +53,8 @@ def detect_absolute_snow(
         (scsi < 9) & (detected_snow == True) & (vis_saturation == False)
     )
 
-    logger.debug("Detected %s pixels of absolute snow", np.sum(absolute_snow))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Detected %s pixels of absolute snow", np.count_nonzero(absolute_snow)
+        )
     return absolute_snow
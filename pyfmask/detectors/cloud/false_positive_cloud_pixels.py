@@ -5,7 +5,7 @@ from typing import Optional
 import numpy as np
 from pyfmask.classes import DEMData
 from pyfmask.classes import PlatformData
-from skimage import morphology
+from pyfmask.raster_utilities.morphology import dilate_array
 from skimage.filters import threshold_otsu
 
 
@@ -84,17 +84,17 @@ def detect_false_positive_cloud_pixels(
     ##
     width_m = 250
     width_px = int(width_m / out_resolution)
-    potential_false_positives = morphology.binary_dilation(
-        potential_false_positives.astype(bool), morphology.square(2 * width_px + 1)
-    )
+    potential_false_positives = dilate_array(potential_false_positives, width_px)
 
     potential_false_positives = (potential_false_positives == True) | (snow == True)
     potential_false_positives = (potential_false_positives == True) & (
         nodata_mask == False
     )
 
-    logger.debug(
-        "%s potential false positive cloud pixels", np.sum(potential_false_positives)
-    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "%s potential false positive cloud pixels",
+            np.count_nonzero(potential_false_positives),
+        )
 
     return potential_false_positives
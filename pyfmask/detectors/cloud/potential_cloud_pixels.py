@@ -5,6 +5,8 @@ from typing import Union
 import numpy as np
 from pyfmask.classes import DEMData
 from pyfmask.classes import PotentialCloudPixels
+from pyfmask.raster_utilities.statistics import masked_percentile
+from pyfmask.raster_utilities.statistics import partition_percentile
 
 import logging.config
 
@@ -25,6 +27,7 @@ def detect_potential_cloud_pixels(
     whiteness_limit: float = 0.7,
     ratio_nir_swir_limit: float = 0.75,
     normalized_cirrus_limit: int = 100,
+    block_rows: int = 32,
 ) -> PotentialCloudPixels:
 
     nir: np.ndarray = band_data["NIR"]
@@ -39,44 +42,84 @@ def detect_potential_cloud_pixels(
     dem: Optional[np.ndarray] = dem_data.dem if dem_data is not None else None
 
     ##
-    # Step 1: Basic cloud test
+    # Steps 1 - 4 are applied in blocks of `block_rows` rows, so each block of
+    # the bands is read from memory once and reused from cache by every test.
+    # Tests are ANDed into `potential_pixels` in place
     ##
-    potential_pixels: np.ndarray = (
-        (ndsi < ndsi_limit) & (ndvi < ndvi_limit) & (swir2 > swir2_limit)
-    )
-
-    if bt is not None:
-        potential_pixels = (potential_pixels == True) & (bt < bt_limt)
+    potential_pixels: np.ndarray = np.empty(ndsi.shape, dtype=bool)
+    whiteness: np.ndarray = np.empty(ndsi.shape, dtype=np.float32)
+    hot: np.ndarray = np.empty(ndsi.shape, dtype=np.float32)
 
-    ##
-    # Step 2: Whiteness test
-    ##
-    visible_mean: np.ndarray = (blue + green + red) / 3.0
-    whiteness: np.ndarray = (
-        np.absolute(blue - visible_mean)
-        + np.absolute(green - visible_mean)
-        + np.absolute(red - visible_mean)
-    ) / visible_mean
-    whiteness[vis_saturation == True] = 0
-    # # If one visible is saturated whiteness == 0
-    potential_pixels = (potential_pixels == True) & (whiteness < whiteness_limit)
-
-    ##
-    # Step 3: Haze test
-    ##
-    hot: np.ndarray = blue - 0.5 * red - 800
-    potential_pixels = (potential_pixels == True) & (
-        (hot > 0) | (vis_saturation == True)
+    test_scratch: np.ndarray = np.empty((block_rows, *ndsi.shape[1:]), dtype=bool)
+    visible_mean_scratch: np.ndarray = np.empty(
+        (block_rows, *ndsi.shape[1:]), dtype=np.float32
     )
-
-    ##
-    # Step 4: Ratio NIR / SWIR > limit
-    ##
-    ratio_nir_swir: np.ndarray = nir / swir1
-    potential_pixels = (potential_pixels == True) & (
-        ratio_nir_swir > ratio_nir_swir_limit
+    value_scratch: np.ndarray = np.empty(
+        (block_rows, *ndsi.shape[1:]), dtype=np.float32
     )
 
+    for start in range(0, ndsi.shape[0], block_rows):
+        rows: slice = slice(start, start + block_rows)
+
+        pixels: np.ndarray = potential_pixels[rows]
+        block_rows_count: int = pixels.shape[0]
+        test: np.ndarray = test_scratch[:block_rows_count]
+        visible_mean: np.ndarray = visible_mean_scratch[:block_rows_count]
+        value: np.ndarray = value_scratch[:block_rows_count]
+
+        blue_block: np.ndarray = blue[rows]
+        green_block: np.ndarray = green[rows]
+        red_block: np.ndarray = red[rows]
+        vis_saturation_block: np.ndarray = vis_saturation[rows]
+
+        ##
+        # Step 1: Basic cloud test
+        ##
+        np.less(ndsi[rows], ndsi_limit, out=pixels)
+        pixels &= np.less(ndvi[rows], ndvi_limit, out=test)
+        pixels &= np.greater(swir2[rows], swir2_limit, out=test)
+
+        if bt is not None:
+            pixels &= np.less(bt[rows], bt_limt, out=test)
+
+        ##
+        # Step 2: Whiteness test
+        ##
+        np.add(blue_block, green_block, out=visible_mean)
+        visible_mean += red_block
+        visible_mean /= 3.0
+
+        whiteness_block: np.ndarray = whiteness[rows]
+        np.subtract(blue_block, visible_mean, out=whiteness_block)
+        np.absolute(whiteness_block, out=whiteness_block)
+        for band_block in (green_block, red_block):
+            np.subtract(band_block, visible_mean, out=value)
+            np.absolute(value, out=value)
+            whiteness_block += value
+        whiteness_block /= visible_mean
+
+        # If one visible is saturated whiteness == 0
+        np.putmask(whiteness_block, vis_saturation_block, 0)
+        pixels &= np.less(whiteness_block, whiteness_limit, out=test)
+
+        ##
+        # Step 3: Haze test
+        ##
+        hot_block: np.ndarray = hot[rows]
+        np.multiply(red_block, 0.5, out=hot_block)
+        np.subtract(blue_block, hot_block, out=hot_block)
+        hot_block -= 800
+
+        np.greater(hot_block, 0, out=test)
+        test |= vis_saturation_block
+        pixels &= test
+
+        ##
+        # Step 4: Ratio NIR / SWIR > limit
+        ##
+        np.divide(nir[rows], swir1[rows], out=value)
+        pixels &= np.greater(value, ratio_nir_swir_limit, out=test)
+
     ##
     # Optional Step 5: Ratio NIR / SWIR > limit
     ##
@@ -90,11 +133,10 @@ def detect_potential_cloud_pixels(
             dem=dem,
         )
 
-        potential_pixels = (potential_pixels == True) | (
-            normalized_cirrus > normalized_cirrus_limit
-        )
+        potential_pixels |= normalized_cirrus > normalized_cirrus_limit
 
-    logger.debug("%s potential cloud pixels", np.sum(potential_pixels))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s potential cloud pixels", np.count_nonzero(potential_pixels))
 
     data: PotentialCloudPixels = PotentialCloudPixels(
         potential_pixels=potential_pixels,
@@ -113,19 +155,17 @@ def normalize_cirrus_dem(
     percentile: Union[float, int] = 2,
 ) -> np.ndarray:
 
-    normalized_cirrus: np.ndarray = np.zeros(cirrus.shape).astype(np.float32)
+    normalized_cirrus: np.ndarray = np.zeros(cirrus.shape, dtype=np.float32)
 
     # clear sky pixels and valid data
-    valid_clear_sky: np.ndarray = (potential_pixels == False) & (nodata_mask == False)
+    valid_clear_sky: np.ndarray = ~potential_pixels & ~nodata_mask
 
     dem_mask: Union[np.ndarray, int] = (dem != -9999) if dem is not None else -1
     if dem is None or (np.sum(dem_mask) < 100):
-        percent = np.percentile(cirrus[valid_clear_sky], percentile)
+        percent = masked_percentile(cirrus, valid_clear_sky, percentile)
 
-        normalized_cirrus = np.where(
-            nodata_mask == False, cirrus - percent, normalized_cirrus
-        )
-        normalized_cirrus[normalized_cirrus < 0] = 0
+        np.subtract(cirrus, percent, out=normalized_cirrus, where=~nodata_mask)
+        np.clip(normalized_cirrus, 0, None, out=normalized_cirrus)
 
         return normalized_cirrus
 
@@ -136,18 +176,48 @@ def normalize_cirrus_dem(
     dem_end: int = int(np.percentile(dem[dem_mask], 99.999))
     step: int = 100
 
-    cirrus_lowest: Union[float, int] = 0.0
-    for k in np.arange(dem_start, dem_end + step, step):
-        mm: np.ndarray = (cirrus >= k) & (cirrus < (k + step))
-        mm_clear: np.ndarray = (mm == True) & (valid_clear_sky == True)
-        if np.sum(mm_clear) > 0:
-            cirrus_lowest = np.percentile(cirrus[mm_clear], percentile)
-        normalized_cirrus = np.where(
-            (nodata_mask == False) & (mm == True),
-            cirrus - cirrus_lowest,
-            normalized_cirrus,
-        )
+    ##
+    # Bin pixels into DEM strata of `step` once. Pixels outside of
+    # all strata, including DEM NoData, are not normalized
+    ##
+    strata_count: int = len(np.arange(dem_start, dem_end + step, step))
+
+    stratum: np.ndarray = np.floor_divide(dem - dem_start, step).astype(np.int16)
+    in_strata: np.ndarray = (dem >= dem_start) & (stratum < strata_count)
+    np.putmask(stratum, ~in_strata, 0)
+
+    ##
+    # Group clear sky cirrus by stratum with one stable sort
+    # and take the percentile of each stratum
+    ##
+    clear_strata: np.ndarray = in_strata & valid_clear_sky
+    clear_stratum: np.ndarray = stratum[clear_strata]
+    clear_cirrus: np.ndarray = cirrus[clear_strata][
+        np.argsort(clear_stratum, kind="stable")
+    ]
+    strata_ends: np.ndarray = np.cumsum(
+        np.bincount(clear_stratum, minlength=strata_count)
+    )
+
+    ##
+    # Strata without clear sky pixels reuse the previous lowest cirrus
+    ##
+    cirrus_lowest: np.ndarray = np.zeros(strata_count, dtype=np.float32)
+    lowest: Union[float, int] = 0.0
+    start: int = 0
+    for index, end in enumerate(strata_ends):
+        if end > start:
+            lowest = partition_percentile(clear_cirrus[start:end], percentile)
+        cirrus_lowest[index] = lowest
+        start = end
+
+    np.subtract(
+        cirrus,
+        cirrus_lowest[stratum],
+        out=normalized_cirrus,
+        where=~nodata_mask & in_strata,
+    )
 
-    normalized_cirrus[normalized_cirrus < 0] = 0
+    np.clip(normalized_cirrus, 0, None, out=normalized_cirrus)
 
     return normalized_cirrus
@@ -9,7 +9,9 @@ import numpy as np
 from pyfmask.classes import DEMData
 from pyfmask.classes import PotentialCloudPixels
 from pyfmask.classes import PotentialClouds
-import statsmodels.api as sm
+from pyfmask.raster_utilities.statistics import masked_percentile
+from pyfmask.raster_utilities.statistics import partition_percentile
+from scipy.stats import t as t_distribution
 
 
 logger = logging.getLogger(__name__)
@@ -30,6 +32,7 @@ def detect_potential_clouds(
     clear_pixels_threshold: int = 40000,
     low_percent: float = 0.175,
     high_percent: float = 0.825,
+    block_rows: int = 32,
 ):
 
     nir: np.ndarray = band_data["NIR"]
@@ -38,19 +41,19 @@ def detect_potential_clouds(
     bt: Optional[np.ndarray] = band_data.get("BT", None)
     dem: Optional[np.ndarray] = dem_data.dem if dem_data is not None else None
 
-    potential_clouds = np.zeros(nir.shape, dtype=np.uint8)
-
-    idused: np.ndarray = np.zeros(nir.shape)
-
     bt_normalized_dem: Optional[np.ndarray] = None
 
-    clear_pixels: np.ndarray = (potential_cloud_pixels.potential_pixels == False) & (
-        nodata_mask == False
-    )
-    sum_clear_pixels: int = np.sum(clear_pixels == True)
+    ##
+    # Masks and their counts are built once and reused
+    ##
+    clear_pixels: np.ndarray = ~potential_cloud_pixels.potential_pixels & ~nodata_mask
+    sum_clear_pixels: int = np.count_nonzero(clear_pixels)
 
-    clear_land_mask: np.ndarray = (clear_pixels == True) & (water == False)
-    clear_water_mask: np.ndarray = (clear_pixels == True) & (water == True)
+    clear_land_mask: np.ndarray = clear_pixels & ~water
+    clear_water_mask: np.ndarray = clear_pixels & water
+
+    sum_clear_land: int = np.count_nonzero(clear_land_mask)
+    sum_clear_water: int = np.count_nonzero(clear_water_mask)
 
     temp_test_low: Union[int, float] = 0
     temp_test_high: Union[int, float] = 0
@@ -60,13 +63,15 @@ def detect_potential_clouds(
     # remove all potential cloud pixels and return
     ##
     if sum_clear_pixels <= clear_pixels_threshold:
-        potential_clouds = np.where(clear_pixels == True, 1, potential_clouds)
-        potential_clouds = np.where(nodata_mask == True, 0, potential_clouds)
+        idused: np.ndarray = np.zeros(nir.shape, dtype=bool)
+
+        # `clear_pixels` already excludes NoData
+        potential_clouds: np.ndarray = clear_pixels.astype(np.uint8)
 
         # cloud_over_land_probability & cloud_over_water_probability are both 100
-        over_land_water_probability: np.ndarray = 100 * np.ones(
-            potential_clouds.shape
-        ).astype(np.uint8)
+        over_land_water_probability: np.ndarray = np.full(
+            potential_clouds.shape, 100, dtype=np.uint8
+        )
 
         return PotentialClouds(
             sum_clear_pixels=sum_clear_pixels,
@@ -77,93 +82,150 @@ def detect_potential_clouds(
         )
 
     ##
-    # Calculate probability of thin clouds
-    ##
-    probability_thin_cloud: Union[int, np.ndarray] = 0
-    if cirrus is not None:
-        probability_thin_cloud = cirrus / 400
-        probability_thin_cloud = np.where(
-            probability_thin_cloud < 0, 0, probability_thin_cloud
-        )
-
-    ##
-    # Cloud probability over land
+    # Percentile based limits need all clear pixels, so they are taken before
+    # the per pixel probabilities
     ##
     over_land_probability_indicator: Union[float, int] = (
-        100.0 * np.sum(clear_land_mask == True) / np.sum(nodata_mask == False)
+        100.0 * sum_clear_land / (nodata_mask.size - np.count_nonzero(nodata_mask))
     )
     if over_land_probability_indicator >= 0.1:
         idused = clear_land_mask
     else:
         idused = clear_pixels
 
-    land_probability_temperature: Union[int, np.ndarray, float] = 1
-    land_probability_brightness: Union[int, np.ndarray, float] = 1
+    hot_limits: Tuple[Union[int, float], Union[int, float]] = (0, 0)
 
     # if BT is available, use temperature probability
     if bt is not None and dem is not None:
 
         bt_normalized_dem = normalize_bt(bt, dem, idused, low_percent, high_percent)
 
-        (
-            land_probability_temperature,
-            temp_test_low,
-            temp_test_high,
-        ) = land_temperature_probability(
-            cast(np.ndarray, bt_normalized_dem), idused, low_percent, high_percent
+        temp_test_low, temp_test_high = land_temperature_limits(
+            bt_normalized_dem, idused, low_percent, high_percent
         )
 
     # if BT is not available, use HOT probability
     else:
 
-        land_probability_brightness = land_brightness_probability_hot(
+        hot_limits = land_brightness_limits_hot(
             potential_cloud_pixels.hot, idused, low_percent, high_percent
         )
 
-        # land_probability_brightness = probl_brightness(
-        #     potential_cloud_pixels.hot, idused, low_percent, high_percent
-        # )
-
-    over_land_probability_variance: np.ndarray = spectral_variance_probability(
-        ndsi, ndvi, ndbi, vis_saturation, potential_cloud_pixels.whiteness
-    )
+    bt_percentile: Optional[Union[int, float]] = None
+    if (bt is not None) & (sum_clear_water > 100):
+        bt_percentile = water_temperature_limit(
+            cast(np.ndarray, bt), clear_water_mask, high_percent
+        )
 
-    over_land_probability: np.ndarray = (
-        land_probability_temperature
-        * over_land_probability_variance
-        * land_probability_brightness
-        + thin_cirrus_weight * probability_thin_cloud
-    )
-    over_land_probability = 100.0 * over_land_probability
+    ##
+    # Cloud probabilities over land and water are computed and combined in
+    # blocks of `block_rows` rows, so every intermediate is block sized
+    ##
+    over_land_probability: np.ndarray = np.empty(nir.shape, dtype=np.float32)
+    over_water_probability: np.ndarray = np.empty(nir.shape, dtype=np.float32)
 
     ##
-    # Cloud probability over water
+    # Block scratch buffers are allocated once, in the dtypes the
+    # probabilities are computed in
     ##
-    over_water_probability_temperature: Union[int, np.ndarray] = 1
-    if (bt is not None) & (np.sum(clear_water_mask == True) > 100):
-        over_water_probability_temperature = water_temperature_probability(
-            cast(np.ndarray, bt), clear_water_mask, high_percent
-        )
+    block_shape: Tuple[int, ...] = (block_rows, *nir.shape[1:])
 
-    over_water_probability_brightness: np.ndarray = water_brightness_probability(swir1)
+    variance_scratch: Tuple[np.ndarray, np.ndarray] = (
+        np.empty(block_shape, dtype=np.float32),
+        np.empty(block_shape, dtype=bool),
+    )
 
-    over_water_probability: np.ndarray = (
-        over_water_probability_temperature * over_water_probability_brightness
-        + thin_cirrus_weight * probability_thin_cloud
+    land_scratch: np.ndarray = np.empty(
+        block_shape,
+        dtype=np.result_type(temp_test_high, bt_normalized_dem)
+        if bt_normalized_dem is not None
+        else np.result_type(potential_cloud_pixels.hot, hot_limits[0]),
     )
-    over_water_probability = 100.0 * over_water_probability
 
-    if np.sum(clear_water_mask == True) > 0:
-        wclr_h = np.percentile(
-            over_water_probability[clear_water_mask == True], 100 * high_percent
+    water_scratch: Optional[np.ndarray] = None
+    if bt_percentile is not None:
+        water_scratch = np.empty(
+            block_shape, dtype=np.result_type(bt_percentile, cast(np.ndarray, bt))
+        )
+
+    thin_cloud_scratch: Optional[np.ndarray] = None
+    if cirrus is not None:
+        thin_cloud_scratch = np.empty(block_shape, dtype=np.result_type(cirrus, 400.0))
+
+    for start in range(0, nir.shape[0], block_rows):
+        rows: slice = slice(start, start + block_rows)
+
+        land_block: np.ndarray = over_land_probability[rows]
+        water_block: np.ndarray = over_water_probability[rows]
+        block_size: int = land_block.shape[0]
+
+        ##
+        # Cloud probability over land
+        ##
+        spectral_variance_probability(
+            ndsi[rows],
+            ndvi[rows],
+            ndbi[rows],
+            vis_saturation[rows],
+            potential_cloud_pixels.whiteness[rows],
+            block_rows=block_rows,
+            out=land_block,
+            scratch=variance_scratch,
+        )
+
+        if bt_normalized_dem is not None:
+            land_block *= land_temperature_probability(
+                bt_normalized_dem[rows],
+                temp_test_low,
+                temp_test_high,
+                out=land_scratch[:block_size],
+            )
+        else:
+            land_block *= land_brightness_probability_hot(
+                potential_cloud_pixels.hot[rows],
+                *hot_limits,
+                out=land_scratch[:block_size],
+            )
+
+        ##
+        # Cloud probability over water
+        ##
+        water_brightness_probability(swir1[rows], out=water_block)
+
+        if water_scratch is not None:
+            water_block *= water_temperature_probability(
+                cast(np.ndarray, bt)[rows],
+                cast(Union[int, float], bt_percentile),
+                out=water_scratch[:block_size],
+            )
+
+        ##
+        # Probability of thin clouds, shared by land and water
+        ##
+        if cirrus is not None:
+            probability_thin_cloud: np.ndarray = np.divide(
+                cirrus[rows], 400, out=cast(np.ndarray, thin_cloud_scratch)[:block_size]
+            )
+            np.clip(probability_thin_cloud, 0, None, out=probability_thin_cloud)
+            probability_thin_cloud *= thin_cirrus_weight
+
+            land_block += probability_thin_cloud
+            water_block += probability_thin_cloud
+
+        land_block *= 100.0
+        water_block *= 100.0
+
+    if sum_clear_water > 0:
+        wclr_h = masked_percentile(
+            over_water_probability, clear_water_mask, 100 * high_percent
         )
     else:
         wclr_h = 0
 
     clr_h: Union[int, float] = 0
-    if np.sum(clear_land_mask == True) > 0:
-        clr_h = np.percentile(
-            over_land_probability[clear_land_mask == True], 100 * high_percent
+    if sum_clear_land > 0:
+        clr_h = masked_percentile(
+            over_land_probability, clear_land_mask, 100 * high_percent
         )
 
     dynamic_water_max: Union[int, float] = (
@@ -173,26 +235,25 @@ def detect_potential_clouds(
         clr_h + cloud_probability_threshold
     )  # dynamic threshold (land)
 
-    id_final_cld = (potential_cloud_pixels.potential_pixels == True) & (
-        ((over_land_probability > dynamic_land_max) & (water == False))
-        | ((over_water_probability > dynamic_water_max) & (water == True))
+    id_final_cld = potential_cloud_pixels.potential_pixels & (
+        ((over_land_probability > dynamic_land_max) & ~water)
+        | ((over_water_probability > dynamic_water_max) & water)
     )
 
     ##
     # Handle extremely cold clouds
     ##
     if bt is not None and dem is not None:
-        id_final_cld = (id_final_cld == True) | (
-            cast(np.ndarray, bt_normalized_dem) < (temp_test_low - 3500)
-        )
+        id_final_cld |= cast(np.ndarray, bt_normalized_dem) < (temp_test_low - 3500)
 
     ##
     # Assign potential clouds
     ##
-    potential_clouds = np.where(id_final_cld, 1, potential_clouds)
-    potential_clouds = np.where(nodata_mask == True, 0, potential_clouds)
+    np.putmask(id_final_cld, nodata_mask, False)
+    potential_clouds = id_final_cld.astype(np.uint8)
 
-    logger.debug("%s potential clouds", np.sum(potential_clouds))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s potential clouds", np.count_nonzero(potential_clouds))
 
     return PotentialClouds(
         sum_clear_pixels=sum_clear_pixels,
@@ -218,56 +279,83 @@ def normalize_bt(bt, dem, idused, low_percent, high_percent):
     dem_b = np.percentile(dem[dem_mask], 0.0001)
     dem_t = np.percentile(dem[dem_mask], 99.999)  # % further exclude non dem pixels.
     # array of temp pixel over clear land (idused)
-    temp_cl = bt[idused]
-    temp_min = np.percentile(temp_cl, low_percent * 100)
-    temp_max = np.percentile(temp_cl, high_percent * 100)
+    temp_cl = np.compress(idused.ravel(), bt.ravel())
+    temp_min = partition_percentile(temp_cl, low_percent * 100, overwrite_input=True)
+    temp_max = partition_percentile(temp_cl, high_percent * 100, overwrite_input=True)
 
     # making a mask of valid observations along with DEM
-    mm = (bt > temp_min) & (bt < temp_max) & (idused == True) & (dem_mask == True)
+    mm = (bt > temp_min) & (bt < temp_max) & idused & dem_mask
     data_bt_c_clear = bt[mm].astype(np.float32)
     data_dem_clear = dem[mm].astype(np.float32)
     total_sample = 40000  # selecting num points with stratification
 
     # Performaing stratification
     step = 300
-    num_strata_avail = 0
-    for k in np.arange(dem_b, dem_t + step, step):
-        mm = (data_dem_clear >= k) & (data_dem_clear < (k + step))
-        if np.sum(mm) > 0:
-            num_strata_avail = num_strata_avail + 1
+    strata = np.arange(dem_b, dem_t + step, step)
+
+    # bin each pixel into its stratum once and group pixels by stratum
+    # with a stable sort, keeping their order within each stratum
+    stratum = np.searchsorted(strata, data_dem_clear, side="right") - 1
+    in_strata = (stratum >= 0) & (data_dem_clear < strata[stratum] + step)
+    strata_pixels = np.flatnonzero(in_strata)
+    strata_pixels = strata_pixels[np.argsort(stratum[in_strata], kind="stable")]
+    strata_counts = np.bincount(stratum[in_strata], minlength=strata.shape[0])
+
+    num_strata_avail = np.count_nonzero(strata_counts)
     num_per_strata = int(round(total_sample / num_strata_avail, 0))
     if num_per_strata < 1:
         # meanining not enough points: return original BT
         return norm_bt
     else:
-        dem_sampled = np.array([])
-        bt_sampled = np.array([])
-        for k in np.arange(dem_b, dem_t + step, step):
-            mm = (data_dem_clear >= k) & (data_dem_clear < (k + step))
-            if np.sum(mm) > 0:
-                tmp_dem = data_dem_clear[mm]
-                tmp_bt = data_bt_c_clear[mm]
+        # sampled pixels are written into one preallocated index array
+        sample_counts = np.minimum(strata_counts, num_per_strata)
+        n_samples = int(sample_counts.sum())
+        sampled_pixels = np.empty(n_samples, dtype=np.intp)
+        start = 0
+        offset = 0
+        for count, sample_count in zip(strata_counts, sample_counts):
+            if count > 0:
                 # randomly selecting locations
                 loc_random = np.random.choice(
-                    np.arange(0, tmp_dem.shape[0]),
-                    size=min(tmp_dem.shape[0], num_per_strata),
+                    np.arange(0, count),
+                    size=sample_count,
                     replace=False,
                 )
-                dem_sampled = np.concatenate((dem_sampled, tmp_dem[loc_random]))
-                bt_sampled = np.concatenate((bt_sampled, tmp_bt[loc_random]))
-        n_samples = dem_sampled.shape[0]
+                sampled_pixels[offset : offset + sample_count] = strata_pixels[
+                    start + loc_random
+                ]
+                offset += sample_count
+            start += count
 
-        # now performing regression
-        X = sm.add_constant(dem_sampled)
-        Y = bt_sampled
-        est = sm.OLS(Y, X).fit()
+        dem_sampled = data_dem_clear[sampled_pixels].astype(np.float64)
+        bt_sampled = data_bt_c_clear[sampled_pixels].astype(np.float64)
 
-        logger.debug("%s regression paramters - %s", len(est.params), est.params)
+        # now performing regression, closed form least squares of BT on DEM
+        dem_deviation = dem_sampled - dem_sampled.mean()
+        dem_sum_squares = np.dot(dem_deviation, dem_deviation)
+
+        # constant DEM or too few samples to estimate a slope
+        if dem_sum_squares == 0 or n_samples < 3:
+            return norm_bt
+
+        rate_lapse = np.dot(dem_deviation, bt_sampled) / dem_sum_squares
+        intercept = bt_sampled.mean() - rate_lapse * dem_sampled.mean()
+
+        logger.debug("regression paramters - %s, %s", intercept, rate_lapse)
+
+        residuals = bt_sampled - (intercept + rate_lapse * dem_sampled)
+        degrees_of_freedom = n_samples - 2
+        rate_lapse_se = np.sqrt(
+            np.dot(residuals, residuals) / degrees_of_freedom / dem_sum_squares
+        )
 
-        if len(est.params) == 1:
+        # perfect fit, the slope has no standard error to test it with
+        if rate_lapse_se == 0:
             return norm_bt
-        rate_lapse = est.params[1]
-        rate_lapse_pvalue = est.pvalues[1]
+
+        rate_lapse_pvalue = 2 * t_distribution.sf(
+            abs(rate_lapse / rate_lapse_se), degrees_of_freedom
+        )
 
         # only perform normalization when
         # rate_lapse<0 and its p-value is significant
@@ -277,61 +365,67 @@ def normalize_bt(bt, dem, idused, low_percent, high_percent):
     return norm_bt
 
 
-def water_temperature_probability(
+def water_temperature_limit(
     bt: np.ndarray, clear_water_mask: np.ndarray, high_percent: float
-) -> np.ndarray:
-    """Calculate temperature probability over water"""
+) -> Union[int, float]:
+    """Take percentile of BT for clear water pixels"""
 
-    ##
-    # Get BT for clear water pixels
-    ##
-    bt_of_clear_water: np.ndarray = bt[clear_water_mask]
-
-    ##
-    # Take percentile
-    ##
-    bt_percentile: np.ndarray = np.percentile(
-        bt_of_clear_water, 100 * high_percent
+    return masked_percentile(
+        bt, clear_water_mask, 100 * high_percent
     )  # (Eq. 8 - Zhu 2012)
 
+
+def water_temperature_probability(
+    bt: np.ndarray,
+    bt_percentile: Union[int, float],
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Calculate temperature probability over water, in `out` if given"""
+
     ##
     # Offset temperature and divide by 4degC
     ##
-    probability: np.ndarray = (bt_percentile - bt) / 400  # Eq. 9 (Zhu 2012)
-    probability = np.where(probability < 0, 0, probability)
+    probability: np.ndarray = np.subtract(bt_percentile, bt, out=out)
+    np.divide(probability, 400, out=probability)  # Eq. 9 (Zhu 2012)
+    np.clip(probability, 0, None, out=probability)
 
     return probability
 
 
 def water_brightness_probability(
-    swir1: np.ndarray, temperature_brightness: int = 1100
+    swir1: np.ndarray,
+    temperature_brightness: int = 1100,
+    out: Optional[np.ndarray] = None,
 ) -> np.ndarray:
-    """Calculate brightness probability over water"""
+    """Calculate brightness probability over water, in `out` if given"""
 
-    probability: np.ndarray = swir1 / temperature_brightness  # (Eq. 10 - Zhu 2012)
-    probability = np.where(probability > 1, 1, probability)
-    probability = np.where(probability < 0, 0, probability)
+    probability: np.ndarray = np.divide(
+        swir1, temperature_brightness, out=out
+    )  # (Eq. 10 - Zhu 2012)
+    np.clip(probability, 0, 1, out=probability)
 
     return probability
 
 
-def land_temperature_probability(
+def land_temperature_limits(
     bt_normalized_dem: np.ndarray,
     idused: np.ndarray,
     low_percent: float,
     high_percent: float,
-) -> Tuple[np.ndarray, Union[int, float], Union[int, float]]:
-    """Calculate land temperature probability"""
+) -> Tuple[Union[int, float], Union[int, float]]:
+    """Calculate land temperature test limits"""
 
-    over_clear_land_pixels: np.ndarray = bt_normalized_dem[idused]
+    over_clear_land_pixels: np.ndarray = np.compress(
+        idused.ravel(), bt_normalized_dem.ravel()
+    )
 
     temp_buffer: int = 4 * 100
 
-    low_percentile: Union[int, float] = np.percentile(
-        over_clear_land_pixels, 100 * low_percent
+    low_percentile: Union[int, float] = partition_percentile(
+        over_clear_land_pixels, 100 * low_percent, overwrite_input=True
     )  # Eq. 12-13 (Zhu 2012)
-    high_percentile: Union[int, float] = np.percentile(
-        over_clear_land_pixels, 100 * high_percent
+    high_percentile: Union[int, float] = partition_percentile(
+        over_clear_land_pixels, 100 * high_percent, overwrite_input=True
     )  # Eq. 12-13 (Zhu 2012)
 
     temp_test_low: Union[int, float] = low_percentile - temp_buffer
@@ -340,46 +434,73 @@ def land_temperature_probability(
     logger.debug("Cloud temp test low: %s ", temp_test_low)
     logger.debug("Cloud temp test high: %s ", temp_test_high)
 
+    return temp_test_low, temp_test_high
+
+
+def land_temperature_probability(
+    bt_normalized_dem: np.ndarray,
+    temp_test_low: Union[int, float],
+    temp_test_high: Union[int, float],
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Calculate land temperature probability, in `out` if given"""
+
     temp_limit: Union[int, float] = temp_test_high - temp_test_low
 
-    probability_temperature = (
-        temp_test_high - bt_normalized_dem
-    ) / temp_limit  # Eq. 14 (Zhu 2012)
+    probability_temperature: np.ndarray = np.subtract(
+        temp_test_high, bt_normalized_dem, out=out
+    )
+    np.divide(
+        probability_temperature, temp_limit, out=probability_temperature
+    )  # Eq. 14 (Zhu 2012)
 
     # probability_temp (i)(n) can be higher than 1
-    probability_temperature = np.where(
-        probability_temperature < 0, 0, probability_temperature
-    )
+    np.clip(probability_temperature, 0, None, out=probability_temperature)
 
-    return probability_temperature, temp_test_low, temp_test_high
+    return probability_temperature
 
 
-def land_brightness_probability_hot(
+def land_brightness_limits_hot(
     hot: np.ndarray, idused: np.ndarray, low_percent: float, high_percent: float
-) -> np.ndarray:
-    """Calculate land brightness probability using HOT"""
+) -> Tuple[Union[int, float], Union[int, float]]:
+    """Calculate land brightness HOT limits"""
 
-    over_clear_land_pixels: np.ndarray = hot[idused]
+    over_clear_land_pixels: np.ndarray = np.compress(idused.ravel(), hot.ravel())
 
-    low_hot_percentile: np.ndarray = (
-        np.percentile(over_clear_land_pixels, 100 * low_percent) - 400
+    low_hot_percentile: Union[int, float] = (
+        partition_percentile(
+            over_clear_land_pixels, 100 * low_percent, overwrite_input=True
+        )
+        - 400
     )
-    high_hot_percentile: np.ndarray = (
-        np.percentile(over_clear_land_pixels, 100 * high_percent) + 400
+    high_hot_percentile: Union[int, float] = (
+        partition_percentile(
+            over_clear_land_pixels, 100 * high_percent, overwrite_input=True
+        )
+        + 400
     )
 
-    probability_brightness: np.ndarray = (hot - low_hot_percentile) / (
-        high_hot_percentile - low_hot_percentile
-    )
-    probability_brightness = np.where(
-        probability_brightness < 0, 0, probability_brightness
-    )
+    return low_hot_percentile, high_hot_percentile
+
 
-    # probability_brightness(i)(n) cannot be higher than 1
-    probability_brightness = np.where(
-        probability_brightness > 1, 1, probability_brightness
+def land_brightness_probability_hot(
+    hot: np.ndarray,
+    low_hot_percentile: Union[int, float],
+    high_hot_percentile: Union[int, float],
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Calculate land brightness probability using HOT, in `out` if given"""
+
+    probability_brightness: np.ndarray = np.subtract(hot, low_hot_percentile, out=out)
+    np.divide(
+        probability_brightness,
+        high_hot_percentile - low_hot_percentile,
+        out=probability_brightness,
     )
 
+    # probability_brightness(i)(n) cannot be lower than 0 or higher than 1
+    np.clip(probability_brightness, 0, 1, out=probability_brightness)
+
     return probability_brightness
 
 
@@ -389,19 +510,56 @@ def spectral_variance_probability(
     ndbi: np.ndarray,
     vis_saturation: np.ndarray,
     whiteness: np.ndarray,
+    block_rows: int = 32,
+    out: Optional[np.ndarray] = None,
+    scratch: Optional[Tuple[np.ndarray, np.ndarray]] = None,
 ) -> np.ndarray:
-    """Overland spectral variance test"""
+    """Overland spectral variance test, in float32 `out` if given
 
-    ndsi = np.where((vis_saturation == True) & (ndsi < 0), 0, ndsi)
-    ndvi = np.where((vis_saturation == True) & (ndvi > 0), 0, ndvi)
+    Rows are processed in blocks of `block_rows`, so each input is read once
+    and every step works in cache on block sized buffers. `scratch` holds
+    float32 and bool buffers of at least `block_rows` rows, reused if given
+    """
 
-    ndsi = np.absolute(ndsi)
-    ndvi = np.absolute(ndvi)
-    ndbi = np.absolute(ndbi)
+    probability_variance: np.ndarray = (
+        np.empty(ndsi.shape, dtype=np.float32) if out is None else out
+    )
 
-    probability_variance: np.ndarray = 1 - np.maximum(
-        np.maximum(np.maximum(ndsi, ndvi), ndbi), whiteness
-    )  # Eq. 15 with added NDBI (Zhe 2012)
+    value_scratch: np.ndarray
+    saturated_scratch: np.ndarray
+    if scratch is None:
+        value_scratch = np.empty((block_rows, *ndsi.shape[1:]), dtype=np.float32)
+        saturated_scratch = np.empty((block_rows, *ndsi.shape[1:]), dtype=bool)
+    else:
+        value_scratch, saturated_scratch = scratch
+
+    for start in range(0, ndsi.shape[0], block_rows):
+        rows: slice = slice(start, start + block_rows)
+
+        probability: np.ndarray = probability_variance[rows]
+        value: np.ndarray = value_scratch[: probability.shape[0]]
+        saturated: np.ndarray = saturated_scratch[: probability.shape[0]]
+
+        ##
+        # Absolute NDSI and NDVI are 0 where saturated and NDSI < 0 / NDVI > 0
+        ##
+        np.absolute(ndsi[rows], out=probability)
+        np.less(ndsi[rows], 0, out=saturated)
+        saturated &= vis_saturation[rows]
+        np.putmask(probability, saturated, 0)
+
+        np.absolute(ndvi[rows], out=value)
+        np.greater(ndvi[rows], 0, out=saturated)
+        saturated &= vis_saturation[rows]
+        np.putmask(value, saturated, 0)
+        np.maximum(probability, value, out=probability)
+
+        np.absolute(ndbi[rows], out=value)
+        np.maximum(probability, value, out=probability)
+        np.maximum(probability, whiteness[rows], out=probability)
+
+        # Eq. 15 with added NDBI (Zhe 2012)
+        np.subtract(1, probability, out=probability)
 
     return probability_variance
 
@@ -60,12 +60,10 @@ def match_cloud_shadows(
     sun_azimuth: float = platform_data.sun_azimuth
 
     cloud_potential: np.ndarray = (cloud == True) & (nodata_mask == False)
-    shadow_potential: np.ndarray = np.where(
-        potential_cloud_shadow_pixels == True, True, False
-    )
+    shadow_potential: np.ndarray = potential_cloud_shadow_pixels == True
 
     # template array for matched cloud shadows
-    matched_cloud_shadow_layer: np.ndarray = np.zeros(cloud.shape).astype(bool)
+    matched_cloud_shadow_layer: np.ndarray = np.zeros(cloud.shape, dtype=bool)
 
     revised_cloud_percent: np.ndarray = np.sum(cloud_potential == True) / np.sum(
         nodata_mask == False
@@ -78,9 +76,7 @@ def match_cloud_shadows(
 
         logger.debug("Skipping cloud shadow detection due to high cloud cover")
 
-        matched_cloud_shadow_layer = np.where(
-            shadow_potential == False, 1, matched_cloud_shadow_layer
-        )
+        matched_cloud_shadow_layer[shadow_potential == False] = True
         similar_num = -1
         return matched_cloud_shadow_layer
 
@@ -97,17 +93,18 @@ def match_cloud_shadows(
     ##
     # Label clouds
     ##
-    cloud_labels: np.ndarray = label(cloud_potential, connectivity=2)
+    cloud_labels: np.ndarray
+    cloud_count: int
+    cloud_labels, cloud_count = label(cloud_potential, connectivity=2, return_num=True)
     cloud_labels_props: list = regionprops(cloud_labels, cache=True)
-    cloud_labels_list: np.ndarray = np.unique(cloud_labels[cloud_labels > 0])
 
     ##
-    # Guard if there are no clouds
+    # Guard if there are no clouds, labels are consecutive from 1
     ##
-    if np.size(cloud_labels_list) == 0:
+    if cloud_count == 0:
         return matched_cloud_shadow_layer
 
-    logger.debug("%s cloud labels", np.max(cloud_labels_list))
+    logger.debug("%s cloud labels", cloud_count)
 
     ##
     # Label shadows
@@ -115,7 +112,7 @@ def match_cloud_shadows(
     shadow_labels: np.ndarray = label(shadow_potential, connectivity=2)
 
     # # Final array with matched shadows
-    # matched_cloud_shadow_layer = np.zeros(cloud.shape).astype(bool)
+    # matched_cloud_shadow_layer = np.zeros(cloud.shape, dtype=bool)
 
     ##
     # Iterate labelled clouds
@@ -273,7 +270,7 @@ def match_cloud_shadows(
             dy = int(dy1_tmp + i * y_step)
 
             # we need to mask out cloud in the template
-            shadow_template_tmp = np.zeros(shadow_template.shape).astype(bool)
+            shadow_template_tmp = np.zeros(shadow_template.shape, dtype=bool)
             if (abs(dy) < shadow_template_tmp.shape[0]) & (
                 abs(dx) < shadow_template_tmp.shape[1]
             ):
@@ -451,7 +448,9 @@ def match_cloud_shadows(
                     | shadow_template[r0_shift:r1_shift, c0_shift:c1_shift]
                 )
 
-    logger.debug(
-        "Sum of matched cloud shadow layer %s", np.sum(matched_cloud_shadow_layer)
-    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Sum of matched cloud shadow layer %s",
+            np.count_nonzero(matched_cloud_shadow_layer),
+        )
     return matched_cloud_shadow_layer
@@ -67,19 +67,16 @@ def detect_potential_cloud_shadow_pixels(
     ##
     # Potential shadow mask
     ##
-    shadow_mask: np.ndarray = np.where(
-        shadow_probability > potential_shadow_threshold, 1, 0
-    ).astype(np.uint8)
+    shadow_mask: np.ndarray = shadow_probability > potential_shadow_threshold
 
     ##
     # Remove potential shadows smaller than 3 pixels
     ##
-    shadow_mask = morphology.remove_small_objects(
-        shadow_mask.astype(bool), 3, connectivity=2
-    )
+    shadow_mask = morphology.remove_small_objects(shadow_mask, 3, connectivity=2)
     shadow_mask = np.where(nodata_mask, 255, shadow_mask)
 
-    logger.debug("Sum of cloud shadow mask %s", np.sum(shadow_mask))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Sum of cloud shadow mask %s", np.sum(shadow_mask))
 
     return shadow_mask
 
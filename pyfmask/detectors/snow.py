@@ -16,7 +16,8 @@ def detect_snow(ndsi: np.ndarray, band_data: Dict[str, np.ndarray]) -> np.ndarra
     snow: np.ndarray = (ndsi > 0.15) & (nir > 1100) & (green > 1000)
 
     if bt is not None:
-        snow = (snow == True) & (bt < 1000)
+        snow &= bt < 1000
 
-    logger.debug("Detected %s pixels of snow", np.sum(snow))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Detected %s pixels of snow", np.count_nonzero(snow))
     return snow
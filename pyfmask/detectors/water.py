@@ -14,34 +14,30 @@ def detect_water(
     gswo_data: Optional[GSWOData] = None,
 ) -> Tuple[np.ndarray, np.ndarray]:
 
-    water: np.ndarray = np.zeros(nir.shape).astype(bool)
     gswo: Optional[np.ndarray] = gswo_data.gswo if gswo_data is not None else None
 
-    water = np.where(
-        ((ndvi < 0.01) & (nir < 1100)) | ((ndvi < 0.1) & (ndvi > 0) & (nir < 500)),
-        1,
-        water,
+    water: np.ndarray = ((ndvi < 0.01) & (nir < 1100)) | (
+        (ndvi < 0.1) & (ndvi > 0) & (nir < 500)
     )
 
-    water = np.where(nodata_mask, 0, water)
+    water[nodata_mask] = False
 
-    all_water: np.ndarray = np.where(nodata_mask, 0, water)
+    all_water: np.ndarray = water.copy()
 
     if gswo is None or snow is None:
         return water, all_water
 
     # if not water present
-    if np.sum(gswo) <= 0:
+    if not np.any(gswo > 0):
         return water, all_water
 
     # assume the water occurances are similar in each whole scene
     # global surface water occurance (GSWO)
     # low level to exclude the commssion errors as water.
     # 5% tolerances
-    mm: np.ndarray = water[water == 1]
-    if np.sum(mm) > 0:
+    if water.any():
         gswater_occur = (
-            np.percentile(gswo[water == 1], 17.5) - 5
+            np.percentile(gswo[water], 17.5) - 5
         )  # prctile(gswater(water==1),17.5)-5
     else:
         gswater_occur = 90
@@ -56,13 +52,14 @@ def detect_water(
         return water, all_water
 
     water_gs = gswo > gswater_occur
-    all_water = np.where(water_gs == True, 1, all_water)
+    all_water[water_gs] = True
 
-    water = np.where((water_gs == True) & (snow == False), 1, water)
+    water[water_gs & ~snow.astype(bool, copy=False)] = True
 
-    water = np.where(nodata_mask, 0, water)
-    all_water = np.where(nodata_mask, 0, all_water)
+    water[nodata_mask] = False
+    all_water[nodata_mask] = False
 
-    logger.debug("Detected %s pixels of water", np.sum(water))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Detected %s pixels of water", np.count_nonzero(water))
 
     return water, all_water
@@ -13,6 +13,7 @@ from pyfmask.extractors.auxillary_data.dataset_creator import create_mapzen_data
 from pyfmask.extractors.auxillary_data.types import AuxTypes
 from pyfmask.classes import DEMData
 from pyfmask.classes import GSWOData
+from pyfmask.raster_utilities.io import gdal_num_threads
 
 try:
     import gdal
@@ -26,6 +27,7 @@ logger = logging.getLogger(__name__)
 RESAMPLING_METHOD: Final[str] = "bilinear"
 
 
+@gdal_num_threads()
 def extract_aux_data(
     aux_path: Optional[Path],
     aux_type: AuxTypes,
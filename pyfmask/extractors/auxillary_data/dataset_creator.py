@@ -21,6 +21,8 @@ except ImportError:
 
 
 RESAMPLING_METHOD: Final[str] = "bilinear"
+WARP_OPTIONS: Final[List[str]] = ["NUM_THREADS=ALL_CPUS"]
+WARP_MEMORY_LIMIT: Final[int] = 2048  # MB
 
 logger = logging.getLogger(__name__)
 
@@ -119,6 +121,9 @@ def create_local_aux_dataset(
         srcNodata=no_data,
         dstNodata=no_data,
         format="GTiff",
+        multithread=True,
+        warpOptions=WARP_OPTIONS,
+        warpMemoryLimit=WARP_MEMORY_LIMIT,
     )
 
     if not ds:
@@ -188,6 +193,9 @@ def create_mapzen_dataset(
         srcNodata=no_data,
         dstNodata=no_data,
         format="GTiff",
+        multithread=True,
+        warpOptions=WARP_OPTIONS,
+        warpMemoryLimit=WARP_MEMORY_LIMIT,
     )
 
     if not ds:
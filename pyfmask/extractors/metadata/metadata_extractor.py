@@ -1,7 +1,13 @@
+from copy import deepcopy
+from functools import lru_cache
 from os import path
+from os import stat
+from types import MappingProxyType
 from typing import Dict
 from typing import List
+from typing import Mapping
 from typing import Optional
+from typing import Tuple
 from typing import cast
 import xml.etree.ElementTree as ET
 from pathlib import Path
@@ -30,6 +36,71 @@ def extract_metadata(file_path: Path, *args, **kwargs):
         raise ValueError("Metadata type not supported")
 
 
+@lru_cache(maxsize=8)
+def _parse_XML_cached(
+    file_path: str, modified_ns: int
+) -> Tuple[ET.ElementTree, Dict[str, str]]:
+    """Parse `file_path` XML file once per `modified_ns` into its tree and namespaces"""
+
+    namespaces: Dict[str, str] = dict(
+        [node for _, node in ET.iterparse(file_path, events=["start-ns"])]
+    )
+
+    return ET.parse(file_path), namespaces
+
+
+def _parse_XML(file_path: str) -> Tuple[ET.ElementTree, Dict[str, str]]:
+    """Copy of the parsed `file_path` XML tree and namespaces
+
+    Parses are cached by path and modification time, so a rewritten file
+    is parsed again
+    """
+
+    tree: ET.ElementTree
+    namespaces: Dict[str, str]
+    tree, namespaces = _parse_XML_cached(file_path, stat(file_path).st_mtime_ns)
+
+    return deepcopy(tree), dict(namespaces)
+
+
+@lru_cache(maxsize=8)
+def _parse_TXT_cached(
+    file_path: str, modified_ns: int, delineator: str
+) -> Mapping[str, Tuple[int, Optional[str]]]:
+    """Parse `file_path` TXT file once per `modified_ns` into `{key: (line_number, value)}`
+
+    `value` is None for lines without a `delineator`. The mapping is read-only
+    """
+
+    lines: Dict[str, Tuple[int, Optional[str]]] = {}
+
+    with open(file_path) as file:
+        for line_number, line in enumerate(file):
+
+            split: List[str] = line.split(delineator)
+            split = [x.strip(" ") for x in split]
+
+            if not len(split) <= 2:
+                raise AssertionError(
+                    f"Line {line_number} violates formatting assumptions"
+                )
+
+            lines[split[0]] = (
+                line_number,
+                split[1].strip("\n") if len(split) == 2 else None,
+            )
+
+    return MappingProxyType(lines)
+
+
+def _parse_TXT(
+    file_path: str, delineator: str
+) -> Mapping[str, Tuple[int, Optional[str]]]:
+    """Parsed `file_path` TXT file, cached by path and modification time"""
+
+    return _parse_TXT_cached(file_path, stat(file_path).st_mtime_ns, delineator)
+
+
 def extract_XML_metadata(
     file_path: str, target_attributes: List[str]
 ) -> Dict[str, str]:
@@ -57,11 +128,10 @@ def extract_XML_metadata(
     if file_extension != ".xml":
         raise TypeError(f"{file_path} is not an XML file")
 
-    namespaces: Dict[str, str] = dict(
-        [node for _, node in ET.iterparse(file_path, events=["start-ns"])]
-    )
+    tree: ET.ElementTree
+    namespaces: Dict[str, str]
+    tree, namespaces = _parse_XML(file_path)
 
-    tree: ET.ElementTree = ET.parse(file_path)
     found_attributes: Dict[str, str] = {}
 
     for target_attribute in target_attributes:
@@ -107,26 +177,21 @@ def extract_TXT_metadata(
 
     found_attributes: Dict[str, Optional[str]] = {k: None for k in target_attributes}
 
-    with open(file_path) as file:
-        for line_number, line in enumerate(file):
+    lines: Mapping[str, Tuple[int, Optional[str]]] = _parse_TXT(file_path, delineator)
 
-            split: List[str] = line.split("=")
-            split = [x.strip(" ") for x in split]
+    for target_attribute in target_attributes:
 
-            if not len(split) <= 2:
-                raise AssertionError(
-                    f"Line {line_number} violates formatting assumptions"
-                )
+        if target_attribute not in lines:
+            continue
 
-            if split[0] not in target_attributes:
-                continue
+        line_number, value = lines[target_attribute]
 
-            if len(split) != 2:
-                raise AssertionError(
-                    f"Found {split[0]} on line {line_number} but line does not meet format assumptions"
-                )
+        if value is None:
+            raise AssertionError(
+                f"Found {target_attribute} on line {line_number} but line does not meet format assumptions"
+            )
 
-            found_attributes[split[0]] = split[1].strip("\n")
+        found_attributes[target_attribute] = value
 
     if not all(found_attributes.values()):
         not_found: List[str] = list(
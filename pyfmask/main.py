@@ -1,12 +1,22 @@
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from functools import lru_cache
 from importlib import resources
 import json
 import logging.config
+import multiprocessing
+import os
 from pathlib import Path
 from shutil import rmtree
 import time
 from typing import Any
 from typing import Dict
+from typing import Final
+from typing import List
 from typing import Optional
+from typing import Tuple
 from typing import Union
 from typing import cast
 
@@ -30,30 +40,55 @@ from pyfmask.extractors.auxillary_data import extract_aux_data
 from pyfmask.platforms.landsat8 import Landsat8
 from pyfmask.platforms.sentinel2 import Sentinel2
 from pyfmask.raster_utilities.composites import create_cdi
-from pyfmask.raster_utilities.composites import create_ndbi
-from pyfmask.raster_utilities.composites import create_ndsi
-from pyfmask.raster_utilities.composites import create_ndvi
+from pyfmask.raster_utilities.composites import create_composites
+from pyfmask.raster_utilities.io import TILE_SIZE
+from pyfmask.raster_utilities.io import TILED_OUTFILE_OPTIONS
 from pyfmask.raster_utilities.io import create_outfile_dataset
 from pyfmask.raster_utilities.io import write_array_to_ds
-from pyfmask.raster_utilities.morphology import dilate_array
+from pyfmask.raster_utilities.morphology import dilate_arrays
 from pyfmask.raster_utilities.morphology import enhance_line
 from pyfmask.raster_utilities.morphology import erode_commissons
 from pyfmask.utils import validate_path
 
 try:
+    import gdal
     import gdalconst
 except ImportError:
+    from osgeo import gdal
     from osgeo import gdalconst
 
 
-with resources.path("pyfmask", "loggingConfig.json") as p:
-    logging_config_path: str = str(p)
+logger = logging.getLogger(__name__)
 
-with open(logging_config_path, "rt") as file:
-    logging_config: dict = json.load(file)
+SUPPORTED_PLATFORMS: Final[Dict[str, Any]] = {
+    "Landsat8": Landsat8,
+    "Sentinel2": Sentinel2,
+}
 
-logging.config.dictConfig(logging_config)
-logger = logging.getLogger(__name__)
+VSIMEM_DIR: Final[str] = "/vsimem"
+
+# Checked in order, so longer suffixes must precede their own endings
+PLATFORM_SUFFIXES: Final[Dict[str, str]] = {
+    "_MTL.txt": "Landsat8",
+    "_MTL.xml": "Landsat8",
+    ".xml": "Sentinel2",
+}
+
+
+@lru_cache(maxsize=1)
+def _load_logging_config() -> dict:
+    """Load the packaged logging configuration"""
+
+    return json.loads(resources.read_text("pyfmask", "loggingConfig.json"))
+
+
+@lru_cache(maxsize=1)
+def _init_logging() -> None:
+    """Apply the packaged logging configuration, once per process"""
+
+    logging.config.dictConfig(_load_logging_config())
+
+    return None
 
 
 class FMask:
@@ -102,6 +137,9 @@ class FMask:
         Value for cloud shadow in fmask result array, default 2
     `cloud_value`: int
         Value for cloud in fmask result array, default 4
+    `nodata_value`: int
+        Value for no data in fmask result array, default 255
+        If every result value fits in fewer than 8 bits, results are saved bit-packed
     `use_mapzen`: bool
         Bool to use Mapzen WMS DEM mapping, default True
         If false, `dem_path` must be given to use DEM operations
@@ -111,6 +149,7 @@ class FMask:
         Bool to automatically save fmask `results` array after `run()` completion, default True
     `delete_temp_dir`: bool
         Bool to automatically delete temporary directory - `temp_dir` - after `run()`, default True
+        If True, intermediate DEM / GSWO rasters are kept in memory instead of `temp_dir`
     `save_cloud_prob`: bool
         Bool to save cloud probability array with fmask results, default True
     `log_in_temp_dir`: bool
@@ -129,11 +168,13 @@ class FMask:
     Methods
     -------
     `run()`
-        Run fmask routine. Generates np.ndarray array `self.results` with value code as described with attributes `water_value`, `snow_value`, `cloud_shadow_value`, `cloud_value`
+        Run fmask routine. Generates np.ndarray array `self.results` with value code as described with attributes `water_value`, `snow_value`, `cloud_shadow_value`, `cloud_value`, `nodata_value`
     `save_results()`
         Save `self.results` to `outfile_path` property
-    `save_array_to_file(array: np.ndarray, file_path: str)`
+    `save_array_to_file(array: np.ndarray, file_path: str, outfile_options: Optional[List[str]], data_type: int)`
         Save `array` to `file_path` using `self.platform_info` raster parameters
+    `run_many(infiles: List[Union[Path, str]], out_dir: Union[Path, str], max_workers: int, **kwargs)`
+        Run and save fmask for each of `infiles` concurrently, one process per scene
 
 
     Example
@@ -184,6 +225,7 @@ class FMask:
         snow_value: int = 3,
         cloud_shadow_value: int = 2,
         cloud_value: int = 4,
+        nodata_value: int = 255,
         use_mapzen: bool = True,
         auto_run: bool = False,
         auto_save: bool = True,
@@ -191,6 +233,8 @@ class FMask:
         save_cloud_prob: bool = True,
         log_in_temp_dir: bool = True,
     ):
+        _init_logging()
+
         self.infile: Path = validate_path(infile, check_exists=True, check_is_file=True)
 
         self.out_dir: Path = validate_path(out_dir, check_is_dir=True)
@@ -236,6 +280,18 @@ class FMask:
         self.snow_value: int = snow_value
         self.cloud_shadow_value: int = cloud_shadow_value
         self.cloud_value: int = cloud_value
+        self.nodata_value: int = nodata_value
+
+        for value_name in (
+            "water_value",
+            "snow_value",
+            "cloud_shadow_value",
+            "cloud_value",
+            "nodata_value",
+        ):
+            if not 0 <= getattr(self, value_name) <= 255:
+                logger.error("`%s` must be within 0 - 255", value_name)
+                raise ValueError(f"`{value_name}` must be within 0 - 255")
 
         self.platform_data: PlatformData
         self.dem_data: Optional[DEMData] = None
@@ -257,10 +313,58 @@ class FMask:
         self.cloud: np.ndarray
 
         self.results: np.ndarray
+        self._scratch_buffer: Optional[np.ndarray] = None
+        self._shape: Tuple[int, int]
 
         if auto_run:
             self.run()
 
+    @classmethod
+    def run_many(
+        cls,
+        infiles: List[Union[Path, str]],
+        out_dir: Union[Path, str],
+        max_workers: int = 2,
+        **kwargs: Any,
+    ) -> List[str]:
+        """Run fmask for each of `infiles` in a pool of worker processes
+
+        Scenes are independent, so each is run and saved by its own `FMask`
+        instance. Workers are spawned rather than forked to keep GDAL state
+        out of child processes, so scripts calling `run_many` must guard it
+        with `if __name__ == "__main__":`. `kwargs` are passed to every `FMask`
+        instance
+
+        Parameters
+        ----------
+
+        infiles: List[Union[Path, str]]
+            Paths to Sentinel-2 or Landsat-8 files EX. {*._MTL.txt, MTD_*.xml}
+        out_dir: Union[Path, str]
+            Directory for program outputs of every scene
+        max_workers: int
+            Number of scenes to process at once, default 2. Each scene holds
+            its band stack and intermediates in memory and already uses
+            threads for reading and morphology
+
+        Returns
+        -------
+        List[str]
+            `outfile_path` of each scene, in order of `infiles`
+        """
+
+        if kwargs.get("out_name") is not None:
+            logger.error("`out_name` cannot be shared between scenes")
+            raise ValueError("`out_name` cannot be shared between scenes")
+
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+            futures = [
+                pool.submit(_run_scene, infile, out_dir, **kwargs) for infile in infiles
+            ]
+
+            return [future.result() for future in futures]
+
     @property
     def outfile_path(self) -> str:
         """Outfile name"""
@@ -297,69 +401,104 @@ class FMask:
         # Update logging file directory
         ##
         if self.log_in_temp_dir:
-            logging_config["handlers"]["debug_file_handler"]["filename"] = (
-                self.temp_dir
-                / logging_config["handlers"]["debug_file_handler"]["filename"]
-            )
-            logging_config["handlers"]["info_file_handler"]["filename"] = (
-                self.temp_dir
-                / logging_config["handlers"]["info_file_handler"]["filename"]
-            )
+            ##
+            # Copy so the cached base config keeps its relative file names
+            # and repeated runs do not nest previous `temp_dir` paths
+            ##
+            logging_config: dict = deepcopy(_load_logging_config())
+            for handler_name in ("debug_file_handler", "info_file_handler"):
+                handler: dict = logging_config["handlers"][handler_name]
+                handler["filename"] = str(self.temp_dir / handler["filename"])
+
             logging.config.dictConfig(logging_config)
             logger.debug("Log location changed to %s", self.temp_dir)
 
         ##
-        # Extract Aux data
+        # Skip detection if scene contains no valid data
         ##
-        self._extract_aux_data()
+        if np.all(self.platform_data.nodata_mask):
+            logger.warning("No valid data in scene, skipping detection")
+            self.results = np.full(
+                self._shape,
+                self.nodata_value,
+                dtype=np.uint8,
+            )
 
-        ##
-        # Create requisite spectral composites
-        ##
-        self._create_spectral_composites()
+            if self.auto_save:
+                self.save_results()
 
-        ##
-        # Detect snow area
-        ##
-        logger.info("Starting snow detection")
-        self.snow = detect_snow(
-            self.ndsi,
-            band_data=self.platform_data.band_data,
-        )
+            if self.delete_temp_dir:
+                self._remove_temp_directory()
 
-        ##
-        # Detect water area
-        ##
-        logger.info("Starting water detection")
-        self.water, self.all_water = detect_water(
-            self.platform_data.band_data["NIR"],
-            self.ndvi,
-            self.platform_data.nodata_mask,
-            self.snow,
-            cast(GSWOData, self.gswo_data),
-        )
+            return None
 
         ##
-        # Calculate CDI if platform is S2
+        # Independent steps are overlapped in threads. Aux data extraction is
+        # I/O bound and the detectors release the GIL in NumPy / SciPy
         ##
-        if self.platform_data.sensor == "S2_MSI":
-            self.cdi = create_cdi(
-                self.platform_data.band_data["NIR"],
-                self.platform_data.band_data["NIR2"],
-                self.platform_data.band_data["RED3"],
+        with ThreadPoolExecutor() as executor:
+
+            ##
+            # Extract Aux data, needed from water detection onwards
+            ##
+            aux_future: Future = executor.submit(self._extract_aux_data)
+
+            band_data: Dict[str, np.ndarray] = self.platform_data.band_data
+
+            ##
+            # Calculate CDI if platform is S2, independent of the composites
+            ##
+            cdi_future: Optional[Future] = None
+            if self.platform_data.sensor == "S2_MSI":
+                cdi_future = executor.submit(
+                    create_cdi,
+                    band_data["NIR"],
+                    band_data["NIR2"],
+                    band_data["RED3"],
+                )
+
+            ##
+            # Create requisite spectral composites
+            ##
+            self._create_spectral_composites()
+
+            ##
+            # Detect snow area
+            ##
+            logger.info("Starting snow detection")
+            self.snow = detect_snow(
+                self.ndsi,
+                band_data=band_data,
             )
 
-        ##
-        # Detect absolute snow (pure snow / ice)
-        ##
-        logger.info("Starting absolute snow detection")
-        self.absolute_snow = detect_absolute_snow(
-            self.platform_data.sensor,
-            self.snow,
-            self.platform_data.band_data,
-            self.platform_data.vis_saturation,
-            self.ndsi,
-        )
+            ##
+            # Detect absolute snow (pure snow / ice)
+            ##
+            logger.info("Starting absolute snow detection")
+            self.absolute_snow = detect_absolute_snow(
+                self.platform_data.sensor,
+                self.snow,
+                band_data,
+                self.platform_data.vis_saturation,
+                self.ndsi,
+            )
+
+            aux_future.result()
+
+            ##
+            # Detect water area
+            ##
+            logger.info("Starting water detection")
+            self.water, self.all_water = detect_water(
+                band_data["NIR"],
+                self.ndvi,
+                self.platform_data.nodata_mask,
+                self.snow,
+                self.gswo_data,
+            )
+
+            if cdi_future is not None:
+                self.cdi = cdi_future.result()
 
         ##
         # Detect cloud area
@@ -371,15 +510,16 @@ class FMask:
         ##
         self._run_cloud_shadow_detection()
 
+        ##
+        # Free intermediates not needed past detection, before
+        # the dilation and results buffers are allocated
+        ##
+        self._release_intermediates()
+
         ##
         # Dilate snow, shadows, and clouds
         ##
-        if self.dilated_snow_px > 0:
-            self.snow = dilate_array(self.snow, self.dilated_snow_px)
-        if self.dilated_shadow_px > 0:
-            self.cloud_shadow = dilate_array(self.cloud_shadow, self.dilated_shadow_px)
-        if self.dilated_cloud_px > 0:
-            self.cloud = dilate_array(self.cloud, self.dilated_cloud_px)
+        self._dilate_masks()
 
         ##
         # Compute final results
@@ -392,20 +532,32 @@ class FMask:
             self.save_results()
 
         if self.delete_temp_dir:
-            logger.debug("Removing temporary directory at %s", self.temp_dir)
-            rmtree(self.temp_dir, ignore_errors=True)
+            self._remove_temp_directory()
 
         return None
 
     def _extract_platform_data(self) -> None:
         """Extract platform data"""
 
-        supported_platforms: Dict[str, Any] = {
-            "Landsat8": Landsat8,
-            "Sentinel2": Sentinel2,
-        }
+        file_name: str = self.infile.name
+        suffix_match: Optional[str] = next(
+            (
+                name
+                for suffix, name in PLATFORM_SUFFIXES.items()
+                if file_name.endswith(suffix)
+            ),
+            None,
+        )
+
+        ##
+        # Probe the platform matching the infile suffix first
+        ##
+        probe_order: List[str] = sorted(
+            SUPPORTED_PLATFORMS, key=lambda name: name != suffix_match
+        )
 
-        for name, platform_object in supported_platforms.items():
+        for name in probe_order:
+            platform_object: Any = SUPPORTED_PLATFORMS[name]
             if platform_object.is_platform(self.infile):
 
                 logging.info("Identified as %s", name)
@@ -416,6 +568,8 @@ class FMask:
             logger.error("Platform not found or supported", stack_info=True)
             raise ValueError("Platform not found or supported")
 
+        self._shape = (self.platform_data.y_size, self.platform_data.x_size)
+
         return None
 
     def _extract_aux_data(self) -> None:
@@ -430,9 +584,28 @@ class FMask:
             "geo_transform": self.platform_data.geo_transform,
             "out_resolution": self.platform_data.out_resolution,
             "scene_id": self.platform_data.scene_id,
-            "temp_dir": self.temp_dir,
+            "temp_dir": self.aux_dir,
         }
 
+        ##
+        # DEM and GSWO are reprojected concurrently, GDAL releases the GIL
+        ##
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            dem_future: Future = executor.submit(
+                self._extract_dem_data, aux_data_kwargs
+            )
+            gswo_future: Future = executor.submit(
+                self._extract_gswo_data, aux_data_kwargs
+            )
+
+            dem_future.result()
+            gswo_future.result()
+
+        return None
+
+    def _extract_dem_data(self, aux_data_kwargs: Dict[str, Any]) -> None:
+        """Extract DEM, slope and aspect from Mapzen or local DEMs"""
+
         initial_dem_type: AuxTypes = (
             AuxTypes.MAPZEN if self.use_mapzen else AuxTypes.DEM
         )
@@ -462,6 +635,11 @@ class FMask:
 
         self.dem_data = cast(DEMData, dem_data) if dem_data else None
 
+        return None
+
+    def _extract_gswo_data(self, aux_data_kwargs: Dict[str, Any]) -> None:
+        """Extract GSWO from local GSWOs"""
+
         if self.gswo_path:
             gswo_data = extract_aux_data(
                 aux_path=self.gswo_path,
@@ -479,14 +657,13 @@ class FMask:
 
         logger.info("Creating spectral composites")
 
-        self.ndvi = create_ndvi(
-            self.platform_data.band_data["RED"], self.platform_data.band_data["NIR"]
-        )
-        self.ndsi = create_ndsi(
-            self.platform_data.band_data["GREEN"], self.platform_data.band_data["SWIR1"]
-        )
-        self.ndbi = create_ndbi(
-            self.platform_data.band_data["SWIR1"], self.platform_data.band_data["NIR"]
+        band_data: Dict[str, np.ndarray] = self.platform_data.band_data
+
+        self.ndvi, self.ndsi, self.ndbi = create_composites(
+            band_data["RED"],
+            band_data["GREEN"],
+            band_data["NIR"],
+            band_data["SWIR1"],
         )
 
         return None
@@ -504,6 +681,25 @@ class FMask:
 
         self.temp_dir = temp_dir
 
+        ##
+        # Intermediate GDAL rasters are kept in memory unless `temp_dir`
+        # is to be kept for inspection
+        ##
+        self.aux_dir: Path = (
+            Path(VSIMEM_DIR) / temp_name if self.delete_temp_dir else temp_dir
+        )
+
+        return None
+
+    def _remove_temp_directory(self) -> None:
+        """Remove temporary directory and in-memory intermediate rasters"""
+
+        logger.debug("Removing temporary directory at %s", self.temp_dir)
+        rmtree(self.temp_dir, ignore_errors=True)
+
+        if str(self.aux_dir).startswith(VSIMEM_DIR):
+            gdal.RmdirRecursive(str(self.aux_dir))
+
         return None
 
     def _run_cloud_detection(self) -> None:
@@ -511,23 +707,26 @@ class FMask:
 
         logger.info("Starting cloud detection")
 
+        platform_data: PlatformData = self.platform_data
+        band_data: Dict[str, np.ndarray] = platform_data.band_data
+
         ##
         # Detect potential cloud pixels
         ##
         self.potential_cloud_pixels = detect_potential_cloud_pixels(
             ndsi=self.ndsi,
             ndvi=self.ndvi,
-            band_data=self.platform_data.band_data,
-            vis_saturation=self.platform_data.vis_saturation,
+            band_data=band_data,
+            vis_saturation=platform_data.vis_saturation,
             dem_data=self.dem_data,
-            nodata_mask=self.platform_data.nodata_mask,
+            nodata_mask=platform_data.nodata_mask,
         )
 
         ##
         # Update cirrus clouds
         ##
-        if self.platform_data.band_data.get("CIRRUS") is not None:
-            self.platform_data.band_data["CIRRUS"] = cast(
+        if band_data.get("CIRRUS") is not None:
+            band_data["CIRRUS"] = cast(
                 np.ndarray, self.potential_cloud_pixels.normalized_cirrus
             )
 
@@ -535,43 +734,41 @@ class FMask:
         # Detect potential clouds
         ##
         self.potential_clouds = detect_potential_clouds(
-            self.platform_data.band_data,
+            band_data,
             self.dem_data,
             self.potential_cloud_pixels,
-            self.platform_data.nodata_mask,
+            platform_data.nodata_mask,
             self.water,
-            self.platform_data.probability_weight,  # thin / cirrus weight
-            self.platform_data.cloud_threshold,  # cloud prob threshold
+            platform_data.probability_weight,  # thin / cirrus weight
+            platform_data.cloud_threshold,  # cloud prob threshold
             self.ndsi,
             self.ndvi,
             self.ndbi,
-            self.platform_data.vis_saturation,
+            platform_data.vis_saturation,
         )
 
         ##
         # Update DEM normalized BT clouds
         ##
         if (
-            self.platform_data.band_data.get("BT", None) is not None
+            band_data.get("BT", None) is not None
             and self.potential_clouds.bt_normalized_dem is not None
         ):
-            self.platform_data.band_data["BT"] = cast(
-                np.ndarray, self.potential_clouds.bt_normalized_dem
-            )
+            band_data["BT"] = cast(np.ndarray, self.potential_clouds.bt_normalized_dem)
 
         ##
         # Enhance NDBI for high urban/built-up areas
         ##
-        self.ndbi = enhance_line(self.ndbi)
+        self.ndbi = enhance_line(self.ndbi, out=self.ndbi)
 
         ##
         # Detect potential false positives in cloud layer
         ##
         potential_false_positives: np.ndarray = detect_false_positive_cloud_pixels(
-            self.platform_data.band_data,
+            band_data,
             self.ndbi,
             self.ndvi,
-            self.platform_data,
+            platform_data,
             self.snow,
             self.water,
             self.potential_clouds.cloud,
@@ -587,7 +784,7 @@ class FMask:
             self.potential_clouds.cloud,
             potential_false_positives,
             self.water,
-            self.platform_data.erode_pixels,
+            platform_data.erode_pixels,
         )
 
         logger.debug("Finished cloud detection")
@@ -602,7 +799,7 @@ class FMask:
         if self.potential_clouds.sum_clear_pixels < pixel_limit:
 
             logger.debug("No clear pixels in image")
-            self.cloud_shadow = np.where(self.cloud == 0, 1, 0)
+            self.cloud_shadow = np.invert(self.cloud.astype(bool, copy=False))
             return
 
         ##
@@ -632,39 +829,117 @@ class FMask:
 
         return None
 
-    def _compute_final_results(self) -> None:
-        """Compute final fmask array results"""
+    def _dilate_masks(self) -> None:
+        """Dilate snow, shadows, and clouds, sharing a pass where radii match"""
 
-        final_array: np.ndarray = np.zeros(
-            self.potential_clouds.cloud.shape, dtype=np.uint8
-        )
+        dilation_groups: Dict[int, List[str]] = {}
+        for name, amount in (
+            ("snow", self.dilated_snow_px),
+            ("cloud_shadow", self.dilated_shadow_px),
+            ("cloud", self.dilated_cloud_px),
+        ):
+            if amount > 0:
+                dilation_groups.setdefault(amount, []).append(name)
 
         ##
-        # Water
+        # Groups with different radii are independent and SciPy filters
+        # release the GIL, so they are dilated concurrently. The CPUs are
+        # shared between the groups' tile threads
         ##
-        final_array = np.where(self.water > 0, self.water_value, final_array)
+        groups_count: int = len(dilation_groups) or 1
+        tile_workers: int = max(1, (os.cpu_count() or 1) // groups_count)
+
+        with ThreadPoolExecutor(max_workers=groups_count) as executor:
+            group_futures: Dict[int, Future] = {
+                amount: executor.submit(
+                    dilate_arrays,
+                    [getattr(self, name) for name in names],
+                    amount,
+                    max_workers=tile_workers,
+                )
+                for amount, names in dilation_groups.items()
+            }
+
+        for amount, names in dilation_groups.items():
+            dilated: List[np.ndarray] = group_futures[amount].result()
+
+            for name, array in zip(names, dilated):
+                setattr(self, name, array)
+
+        return None
+
+    def _release_intermediates(self) -> None:
+        """Drop scene-sized intermediates unused after detection
+
+        Keeps `water` and `potential_clouds` for the cloud probability output
+        """
+
+        del self.ndvi, self.ndsi, self.ndbi
+        del self.absolute_snow, self.all_water, self.potential_cloud_pixels
+        self.cdi = None
+
+        return None
+
+    def _get_scratch_buffer(self) -> np.ndarray:
+        """Scene-shaped uint8 scratch buffer, kept between uses and runs"""
+
+        if self._scratch_buffer is None or self._scratch_buffer.shape != self._shape:
+            self._scratch_buffer = np.empty(self._shape, dtype=np.uint8)
+
+        return self._scratch_buffer
+
+    def _compute_final_results(self) -> None:
+        """Compute final fmask array results
+
+        Each pixel's layers are packed into a bit code (water bit 0 up to
+        no data bit 4), which indexes a lookup table holding the value of its
+        highest priority layer. This replaces a masked write per layer
+        """
+
+        shape: Tuple[int, int] = self._shape
 
         ##
-        # Snow
+        # A new array each run, so `results` kept from a previous run are not
+        # overwritten. Every cell is written by the lookup, so it is not zeroed
         ##
-        final_array = np.where(self.snow > 0, self.snow_value, final_array)
+        final_array: np.ndarray = np.empty(shape, dtype=np.uint8)
 
         ##
-        # Cloud Shadow
+        # Layers in increasing priority
         ##
-        final_array = np.where(
-            self.cloud_shadow > 0, self.cloud_shadow_value, final_array
-        )
+        layers: List[Tuple[np.ndarray, int]] = [
+            (self.water, self.water_value),
+            (self.snow, self.snow_value),
+            (self.cloud_shadow, self.cloud_shadow_value),
+            (self.cloud, self.cloud_value),
+            (self.platform_data.nodata_mask, self.nodata_value),
+        ]
+        if any(mask.shape != shape for mask, _ in layers):
+            logger.error("Result mask shapes do not match %s", shape)
+            raise ValueError(f"Result mask shapes do not match {shape}")
 
         ##
-        # Cloud
+        # Lookup table from bit code to the value of its highest set bit
         ##
-        final_array = np.where(self.cloud > 0, self.cloud_value, final_array)
+        codes: np.ndarray = np.arange(1 << len(layers), dtype=np.uint8)
+        lookup: np.ndarray = np.zeros(codes.shape, dtype=np.uint8)
+        for bit, (_, value) in enumerate(layers):
+            lookup[(codes >> bit) & 1 == 1] = value
 
         ##
-        # No Data
+        # Pack boolean masks (`astype` does not copy) into bit codes
         ##
-        final_array = np.where(self.platform_data.nodata_mask, 255, final_array)
+        bit_layer: np.ndarray = self._get_scratch_buffer()
+        for bit, (mask, _) in enumerate(layers):
+            mask_bytes: np.ndarray = mask.astype(bool, copy=False).view(np.uint8)
+            if bit == 0:
+                np.copyto(final_array, mask_bytes)
+                continue
+
+            np.left_shift(mask_bytes, bit, out=bit_layer)
+            np.bitwise_or(final_array, bit_layer, out=final_array)
+
+        np.take(lookup, final_array, out=final_array)
 
         self.results = final_array
 
@@ -673,6 +948,10 @@ class FMask:
     def save_results(self, save_cloud_prob: bool = None) -> None:
         """Save `self.results` to `self.outfile_path`
 
+        Results are bit-packed with NBITS when every value code fits in fewer
+        than 8 bits. The default `nodata_value` of 255 needs 8, so by default
+        they are written as plain bytes
+
         Parameters
         ----------
 
@@ -692,11 +971,36 @@ class FMask:
         logger.info("Saving results")
 
         ##
-        # Save fmask `self.results`
+        # Save fmask `self.results`, bit-packed if all values fit in < 8 bits.
+        # NBITS must be at least 1, also when every value is 0
         ##
+        results_nbits: int = max(
+            1,
+            max(
+                self.water_value,
+                self.snow_value,
+                self.cloud_shadow_value,
+                self.cloud_value,
+                self.nodata_value,
+            ).bit_length(),
+        )
+
+        results_options: List[str] = list(TILED_OUTFILE_OPTIONS)
+        if results_nbits < 8:
+            ##
+            # Horizontal differencing is limited to 8 bit and wider samples
+            ##
+            results_options = [
+                option
+                for option in results_options
+                if not option.startswith("PREDICTOR=")
+            ]
+            results_options.append(f"NBITS={results_nbits}")
+
         self.save_array_to_file(
             self.results,
             self.outfile_path,
+            outfile_options=results_options,
         )
 
         ##
@@ -704,18 +1008,12 @@ class FMask:
         ##
         logger.debug("Saving cloud probability %s", self.save_cloud_prob)
         if save_cloud_prob:
-            cloud_probability: np.ndarray = np.where(
-                self.water == 1,
-                self.potential_clouds.over_water_probability,
-                self.potential_clouds.over_land_probability,
-            )
-            cloud_probability = np.where(cloud_probability < 0, 0, cloud_probability)
-            cloud_probability = np.where(
-                cloud_probability > 100, 100, cloud_probability
-            )
-            cloud_probability = np.where(
-                self.platform_data.nodata_mask, 255, cloud_probability
-            )
+            cloud_probability: np.ndarray = self._get_scratch_buffer()
+            if np.all(self.platform_data.nodata_mask):
+                # detection was skipped, every pixel is no data
+                cloud_probability.fill(255)
+            else:
+                self._compose_cloud_probability(cloud_probability)
 
             outfile_path = self.outfile_path
             if outfile_path[-4:] == ".tif":
@@ -726,19 +1024,64 @@ class FMask:
             self.save_array_to_file(
                 cloud_probability,
                 outfile_path,
+                data_type=gdalconst.GDT_Byte,
             )
 
         return None
 
+    def _compose_cloud_probability(
+        self, out: np.ndarray, block_rows: int = 32
+    ) -> np.ndarray:
+        """Write the uint8 cloud probability into `out` and return it
+
+        Water or land probability by `self.water`, NaN as 0, clipped to 0 - 100,
+        rounded half up like GDAL and 255 for no data, in `block_rows` row blocks
+        """
+
+        water: np.ndarray = self.water.astype(bool, copy=False)
+        nodata_mask: np.ndarray = self.platform_data.nodata_mask
+        over_water: np.ndarray = self.potential_clouds.over_water_probability
+        over_land: np.ndarray = self.potential_clouds.over_land_probability
+
+        block: np.ndarray = np.empty((block_rows, self._shape[1]), dtype=np.float32)
+
+        for start in range(0, self._shape[0], block_rows):
+            rows: slice = slice(start, start + block_rows)
+            block_view: np.ndarray = block[: out[rows].shape[0]]
+
+            np.copyto(block_view, over_land[rows], casting="same_kind")
+            np.copyto(
+                block_view,
+                over_water[rows],
+                casting="same_kind",
+                where=water[rows],
+            )
+            np.nan_to_num(block_view, copy=False, nan=0)
+            np.clip(block_view, 0, 100, out=block_view)
+            np.putmask(block_view, nodata_mask[rows], 255)
+
+            # round half up
+            block_view += 0.5
+            np.floor(block_view, out=block_view)
+
+            np.copyto(out[rows], block_view, casting="unsafe")
+
+        return out
+
     def save_array_to_file(
         self,
         array: np.ndarray,
         file_path: str,
+        outfile_options: Optional[List[str]] = None,
+        data_type: int = gdalconst.GDT_Byte,
     ) -> None:
-        """Save `array` to `file_path` using `self.platform_info` raster parameters"""
+        """Save `array` to `file_path` using `self.platform_info` raster parameters
+
+        `outfile_options` default to tiled, compressed GeoTIFF creation options.
+        `data_type` defaults to Byte, which holds fmask results and probabilities
+        """
 
-        x_size: int = self.potential_clouds.cloud.shape[1]
-        y_size: int = self.potential_clouds.cloud.shape[0]
+        y_size, x_size = self._shape
 
         outfile_ds = create_outfile_dataset(
             file_path,
@@ -747,11 +1090,25 @@ class FMask:
             self.platform_data.projection_reference,
             self.platform_data.geo_transform,
             1,
-            data_type=gdalconst.GDT_Byte,
+            data_type=data_type,
+            outfile_options=outfile_options,
         )
-        outfile_ds = write_array_to_ds(outfile_ds, array)
+        outfile_ds = write_array_to_ds(outfile_ds, array, block_size=TILE_SIZE)
         outfile_ds = None
 
         logger.debug("Saved array to %s", file_path)
 
         return None
+
+
+def _run_scene(
+    infile: Union[Path, str], out_dir: Union[Path, str], **kwargs: Any
+) -> str:
+    """Run and save fmask for a single scene, used by `FMask.run_many`"""
+
+    kwargs.update(auto_run=False, auto_save=True)
+
+    controller = FMask(infile=infile, out_dir=out_dir, **kwargs)
+    controller.run()
+
+    return controller.outfile_path
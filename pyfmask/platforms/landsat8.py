@@ -1,5 +1,7 @@
 from enum import Enum
+from functools import partial
 import logging.config
+import math
 from pathlib import Path
 from typing import Any
 from typing import Dict
@@ -92,6 +94,91 @@ class Landsat8(PlatformBase):
 
         return {k: v.strip('"') for k, v in zip(band_names, file_names.values())}
 
+    @classmethod
+    def _load_band(
+        cls,
+        band: Enum,
+        band_path: Path,
+        calibration: Dict[str, float],
+        reflectance_scale: float,
+        out: np.ndarray,
+    ) -> Dict[str, Any]:
+        """Read `band` from `band_path` and convert it to scaled int16 values in `out`
+
+        `reflectance_scale` is the 10000 / sin(sun elevation) TOA reflectance
+        factor, shared by every band
+
+        Returns the band `nodata` mask and its `saturation` mask for RGB bands
+        """
+
+        band_number = band.value
+        band_name = band.name
+
+        band_ds = gdal.Open(str(band_path))
+        band_array: np.ndarray = cls._read_band(band_ds)
+
+        logger.debug(
+            "Processing band %s - %s from %s", band_number, band_name, band_path
+        )
+
+        band_result: Dict[str, Any] = {
+            "nodata": band_array == 0,
+            "saturation": band_array == 65535 if band in cls.RGB else None,
+        }
+
+        band_ds = None
+
+        ##
+        # Convert to TOA reflectance / scaled BT in place in `out`,
+        # folding the constant factors into the calibration scalars
+        ##
+        if band != cls.Bands.BT:
+            np.multiply(
+                band_array,
+                calibration[f"REFLECTANCE_MULT_BAND_{band_number}"] * reflectance_scale,
+                out=out,
+            )
+            out += (
+                calibration[f"REFLECTANCE_ADD_BAND_{band_number}"] * reflectance_scale
+            )
+
+        elif band == cls.Bands.BT:
+
+            # convert to TOA
+            np.multiply(
+                band_array,
+                calibration[f"RADIANCE_MULT_BAND_{band_number}"],
+                out=out,
+            )
+            out += calibration[f"RADIANCE_ADD_BAND_{band_number}"]
+
+            # convert to kelvin
+            np.divide(
+                calibration[f"K1_CONSTANT_BAND_{band_number}"],
+                out,
+                out=out,
+            )
+            np.log1p(out, out=out)
+            np.divide(
+                calibration[f"K2_CONSTANT_BAND_{band_number}"],
+                out,
+                out=out,
+            )
+
+            # convert to celsisus and scale
+            out -= 273.15
+            out *= 100
+
+        ##
+        # Truncate and clamp to int16 values in place. The band stack is
+        # float, so no int16 copy is made
+        ##
+        np.trunc(out, out=out)
+        np.clip(out, -32768, 32767, out=out)
+        np.putmask(out, band_result["nodata"], cls.NO_DATA)
+
+        return band_result
+
     @classmethod
     def get_data(cls, file_path: Union[Path, str]) -> PlatformData:
 
@@ -119,93 +206,28 @@ class Landsat8(PlatformBase):
             parameters["out_resolution"]
         )
 
-        parameters["band_data"] = {}
-
-        for band in cls.Bands.__members__.values():
-
-            band_number = band.value
-            band_name = band.name
-
-            band_path: Path = file_path.parent / file_band_names[band_name]
-
-            band_ds = gdal.Open(str(band_path))
-            band_array = band_ds.GetRasterBand(1).ReadAsArray().astype(np.uint16)
-
-            logger.debug(
-                "Processing band %s - %s from %s", band_number, band_name, band_path
-            )
+        ##
+        # Use RED band as projection base and band stack shape
+        ##
+        base_ds = gdal.Open(str(file_path.parent / file_band_names["RED"]))
+        parameters["geo_transform"] = base_ds.GetGeoTransform()
+        parameters["projection_reference"] = base_ds.GetProjectionRef()
+        cls._create_band_stack(parameters, (base_ds.RasterYSize, base_ds.RasterXSize))
+        base_ds = None
+
+        reflectance_scale: float = 10000 / math.sin(
+            math.radians(parameters["sun_elevation"])
+        )
 
-            ##
-            # Use RED band as projection base
-            ##
-            if band == cls.Bands.RED:
-                parameters["geo_transform"] = band_ds.GetGeoTransform()
-                parameters["projection_reference"] = band_ds.GetProjectionRef()
-
-            ##
-            # NoData Mask
-            ##
-            if parameters.get("nodata_mask") is None:
-                parameters["nodata_mask"] = band_array == 0
-            else:
-                parameters["nodata_mask"] = (parameters["nodata_mask"] == True) | (
-                    band_array == 0
-                )
-
-            ##
-            # Saturation of visible bands (RGB)
-            ##
-            if parameters.get("vis_saturation") is None:
-                parameters["vis_saturation"] = np.zeros(band_array.shape).astype(bool)
-
-            if band in cls.RGB:
-                parameters["vis_saturation"] = np.where(
-                    band_array == 65535, True, parameters["vis_saturation"]
-                )
-
-            ##
-            # Convert to TOA reflectance
-            ##
-
-            if band != cls.Bands.BT:
-                processed_band_array = (
-                    band_array * calibration[f"REFLECTANCE_MULT_BAND_{band_number}"]
-                    + calibration[f"REFLECTANCE_ADD_BAND_{band_number}"]
-                )
-
-                processed_band_array = (
-                    10000
-                    * processed_band_array
-                    / np.sin(parameters["sun_elevation"] * np.pi / 180.0)
-                )
-
-            elif band == cls.Bands.BT:
-
-                # convert to TOA
-                toa_array: np.ndarray = (
-                    band_array * calibration[f"RADIANCE_MULT_BAND_{band_number}"]
-                    + calibration[f"RADIANCE_ADD_BAND_{band_number}"]
-                )
-
-                # convert to kelvin
-                kelvin_array: np.ndarray = (
-                    calibration[f"K2_CONSTANT_BAND_{band_number}"]
-                ) / np.log(
-                    calibration[f"K1_CONSTANT_BAND_{band_number}"] / toa_array + 1
-                )
-
-                # convert to celsisus and scale
-                celsius_array: np.ndarray = 100 * (kelvin_array - 273.15)
-
-                processed_band_array = celsius_array
-
-            processed_band_array = np.where(
-                band_array == 0, cls.NO_DATA, processed_band_array
-            ).astype(np.int16)
-
-            parameters["band_data"][band_name] = processed_band_array
-
-            band_ds = None
+        cls._load_bands(
+            parameters,
+            file_path.parent,
+            partial(
+                cls._load_band,
+                calibration=calibration,
+                reflectance_scale=reflectance_scale,
+            ),
+        )
 
         parameters["x_size"] = parameters["band_data"]["RED"].shape[1]
         parameters["y_size"] = parameters["band_data"]["RED"].shape[0]
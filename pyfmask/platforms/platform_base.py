@@ -1,9 +1,17 @@
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from pathlib import Path
+from typing import Any
+from typing import Callable
 from typing import Dict
+from typing import List
+from typing import Tuple
 from typing import Union
 
+import numpy as np
 from pyfmask.classes import PlatformData
+from pyfmask.raster_utilities.io import gdal_num_threads
 
 
 class PlatformBase:
@@ -17,11 +25,104 @@ class PlatformBase:
     PROBABILITY_WEIGHT: float  # for thin/cirrus clouds
     OUT_RESOLUTION: int
     NO_DATA: int
+    BAND_DTYPE: type = np.float32
+    BAND_WORKERS: int = 4  # bands loaded at once, bounds in-flight band memory
 
     @staticmethod
     def calculate_erosion_pixels(out_resolution: int) -> int:
         return round(90.0 / out_resolution)
 
+    @classmethod
+    def _create_band_stack(
+        cls, parameters: Dict[str, Any], shape: Tuple[int, int]
+    ) -> None:
+        """Allocate the `parameters["band_data"]` arrays of each band
+
+        The arrays are planes of one contiguous `BAND_DTYPE` allocation in
+        `Bands` order, so bands are converted straight into them
+        """
+
+        band_stack: np.ndarray = np.empty(
+            (len(cls.Bands), *shape), dtype=cls.BAND_DTYPE
+        )
+        parameters["band_data"] = {
+            band.name: band_stack[index] for index, band in enumerate(cls.Bands)
+        }
+
+        return None
+
+    @classmethod
+    def _load_bands(
+        cls,
+        parameters: Dict[str, Any],
+        band_directory: Path,
+        load_band: Callable[..., Dict[str, Any]],
+    ) -> None:
+        """Load each band into its `parameters["band_data"]` array
+
+        `load_band(band, band_path, out=array)` converts one band into `array`
+        and returns its `nodata` and `saturation` masks, which are reduced into
+        the `nodata_mask` and `vis_saturation` of `parameters`
+        """
+
+        def load_band_with_threads(band: Enum) -> Dict[str, Any]:
+            with gdal_num_threads():
+                return load_band(
+                    band,
+                    band_directory / parameters["file_band_names"][band.name],
+                    out=parameters["band_data"][band.name],
+                )
+
+        ##
+        # Bands are read and converted into their stack planes concurrently,
+        # GDAL and NumPy release the GIL. Masks are reduced in band order
+        ##
+        with ThreadPoolExecutor(max_workers=cls.BAND_WORKERS) as executor:
+            band_futures: List[Future] = [
+                executor.submit(load_band_with_threads, band)
+                for band in cls.Bands.__members__.values()
+            ]
+
+            for band, band_future in zip(cls.Bands.__members__.values(), band_futures):
+                band_result: Dict[str, Any] = band_future.result()
+
+                ##
+                # NoData Mask
+                ##
+                if parameters.get("nodata_mask") is None:
+                    parameters["nodata_mask"] = band_result["nodata"]
+                else:
+                    parameters["nodata_mask"] |= band_result["nodata"]
+
+                ##
+                # Saturation of visible bands (RGB)
+                ##
+                if parameters.get("vis_saturation") is None:
+                    parameters["vis_saturation"] = np.zeros(
+                        band_result["nodata"].shape, dtype=bool
+                    )
+
+                if band in cls.RGB:
+                    parameters["vis_saturation"] |= band_result["saturation"]
+
+        return None
+
+    @staticmethod
+    def _read_band(band_ds: Any) -> np.ndarray:
+        """Read the first band of GDAL dataset `band_ds` as uint16
+
+        GDAL converts while reading straight into a new array, rather than
+        returning its own array to be converted with a copy
+        """
+
+        band_array: np.ndarray = np.empty(
+            (band_ds.RasterYSize, band_ds.RasterXSize), dtype=np.uint16
+        )
+
+        band_ds.GetRasterBand(1).ReadAsArray(buf_obj=band_array)
+
+        return band_array
+
     @staticmethod
     def is_platform(file_path: Union[Path, str]) -> bool:
         """Determines if given `file_path` is of class platform type"""
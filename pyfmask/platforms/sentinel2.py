@@ -3,8 +3,8 @@ import logging.config
 from pathlib import Path
 from typing import Any
 from typing import Dict
+from typing import Optional
 from typing import Union
-from skimage.measure import block_reduce
 
 import numpy as np
 from pyfmask.extractors.metadata import extract_metadata
@@ -20,6 +20,35 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+def downsample_2x2(array: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Average 2 x 2 blocks of `array` into float32, in `out` if given
+
+    Matches `block_reduce(array, (2, 2), np.mean)`, including zero padding of
+    odd edges. Sums of four uint16 values are exact in float32
+    """
+
+    y_size, x_size = array.shape
+    if y_size % 2 or x_size % 2:
+        array = np.pad(array, ((0, y_size % 2), (0, x_size % 2)))
+
+    rows: np.ndarray = array[0::2].astype(np.float32)
+    rows += array[1::2]
+
+    blocks: np.ndarray = np.add(rows[:, 0::2], rows[:, 1::2], out=out)
+    blocks *= 0.25
+
+    return blocks
+
+
+def upsample_3x3(array: np.ndarray) -> np.ndarray:
+    """Repeat each pixel of `array` into a 3 x 3 block
+
+    Matches nearest neighbour resampling of 60m to 20m
+    """
+
+    return np.repeat(np.repeat(array, 3, axis=0), 3, axis=1)
+
+
 class Sentinel2(PlatformBase):
     class Bands(Enum):
         BLUE = 2
@@ -97,6 +126,53 @@ class Sentinel2(PlatformBase):
 
         return file_names
 
+    @classmethod
+    def _load_band(cls, band: Enum, band_path: Path, out: np.ndarray) -> Dict[str, Any]:
+        """Read `band` from `band_path` at 20m and convert it to int16 values in `out`
+
+        Returns the band `nodata` mask and its `saturation` mask for RGB bands
+        """
+
+        band_number = band.value
+        band_name = band.name
+
+        logger.debug(
+            "Processing band %s - %s from %s", band_number, band_name, band_path
+        )
+
+        band_ds = gdal.Open(str(band_path))
+
+        band_array: np.ndarray = cls._read_band(band_ds)
+
+        ##
+        # Downsample RGB and NIR to 20m, averaging 2 x 2 blocks into `out`
+        ##
+        if band in cls.RESAMPLE_BANDS:
+            band_array = downsample_2x2(band_array, out=out)
+
+        ##
+        # Upsample CIRRUS to 20m
+        ##
+        if band == cls.Bands.CIRRUS:
+            band_array = upsample_3x3(band_array)
+
+        band_result: Dict[str, Any] = {
+            "nodata": band_array == 0,
+            "saturation": band_array == 65535 if band in cls.RGB else None,
+        }
+
+        band_ds = None
+
+        ##
+        # Clamp to 10000, truncate averaged bands to integers and
+        # assign NoData, in place in `out`
+        ##
+        np.minimum(band_array, 10000, out=out)
+        np.trunc(out, out=out)
+        np.putmask(out, band_result["nodata"], cls.NO_DATA)
+
+        return band_result
+
     @classmethod
     def get_data(cls, file_path: Union[Path, str]) -> PlatformData:
 
@@ -122,88 +198,16 @@ class Sentinel2(PlatformBase):
             parameters["out_resolution"]
         )
 
-        parameters["band_data"] = {}
-
-        for band in cls.Bands.__members__.values():
-
-            band_number = band.value
-            band_name = band.name
-
-            band_path: Path = file_path.parent / file_band_names[band_name]
-
-            logger.debug(
-                "Processing band %s - %s from %s", band_number, band_name, band_path
-            )
-
-            ##
-            # Downsample CIRRUS to 20m
-            ##
-            if band == cls.Bands.CIRRUS:
-                resample_algorithm: str = "near"
-                band_ds = gdal.Warp(
-                    "",
-                    str(band_path),
-                    xRes=20,
-                    yRes=20,
-                    resampleAlg=resample_algorithm,
-                    srcNodata=0,
-                    dstNodata=0,
-                    format="VRT",
-                )
-            else:
-                band_ds = gdal.Open(str(band_path))
-
-            band_array: np.ndarray = np.array(
-                band_ds.GetRasterBand(1).ReadAsArray()
-            ).astype(np.uint16)
-
-            ##
-            # Upsample RGB and NIR to 20m
-            ##
-            if band in cls.RESAMPLE_BANDS:
-                band_array = block_reduce(band_array, block_size=(2, 2), func=np.mean)
-
-            ##
-            # Use SWIR1 band as projection base
-            ##
-            if band == cls.Bands.SWIR1:
-                parameters["geo_transform"] = band_ds.GetGeoTransform()
-                parameters["projection_reference"] = band_ds.GetProjectionRef()
-
-            ##
-            # NoData Mask
-            ##
-            if parameters.get("nodata_mask") is None:
-                parameters["nodata_mask"] = band_array == 0
-            else:
-                parameters["nodata_mask"] = (parameters["nodata_mask"] == True) | (
-                    band_array == 0
-                )
-
-            ##
-            # Saturation of visible bands (RGB)
-            ##
-            if parameters.get("vis_saturation") is None:
-                parameters["vis_saturation"] = np.zeros(band_array.shape).astype(bool)
-
-            if band in cls.RGB:
-                parameters["vis_saturation"] = np.where(
-                    band_array == 65535, True, parameters["vis_saturation"]
-                )
-
-            ##
-            # Assign NoData
-            ##
-            processed_band_array: np.ndarray = np.where(
-                band_array > 10000, 10000, band_array
-            )
-            processed_band_array = np.where(
-                band_array == 0, cls.NO_DATA, band_array
-            ).astype(np.int16)
-
-            parameters["band_data"][band_name] = processed_band_array
-
-            band_ds = None
+        ##
+        # Use SWIR1 band as projection base and band stack shape
+        ##
+        base_ds = gdal.Open(str(file_path.parent / file_band_names["SWIR1"]))
+        parameters["geo_transform"] = base_ds.GetGeoTransform()
+        parameters["projection_reference"] = base_ds.GetProjectionRef()
+        cls._create_band_stack(parameters, (base_ds.RasterYSize, base_ds.RasterXSize))
+        base_ds = None
+
+        cls._load_bands(parameters, file_path.parent, cls._load_band)
 
         parameters["x_size"] = parameters["band_data"]["RED"].shape[1]
         parameters["y_size"] = parameters["band_data"]["RED"].shape[0]
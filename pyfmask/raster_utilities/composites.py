@@ -1,17 +1,85 @@
+from typing import Optional
+from typing import Tuple
+
 import numpy as np
 from pyfmask.raster_utilities.morphology import focal_variance
 
 
+def normalized_difference(
+    array_1: np.ndarray,
+    array_2: np.ndarray,
+    eps: float = 1e-7,
+    out: Optional[np.ndarray] = None,
+    scratch: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Normalized difference of `array_1` and `array_2` as float32
+
+    Written to `out` if given. The denominator is built in `scratch` if given
+    """
+
+    array_1 = array_1.astype(np.float32, copy=False)
+    array_2 = array_2.astype(np.float32, copy=False)
+
+    difference: np.ndarray = np.subtract(array_1, array_2, out=out)
+    total: np.ndarray = np.add(array_1, array_2, out=scratch)
+    total += np.float32(eps)
+
+    return np.divide(difference, total, out=difference)
+
+
 def create_ndvi(red: np.ndarray, nir: np.ndarray, eps: float = 1e-7) -> np.ndarray:
-    return (nir - red) / (nir + red + eps)
+    return normalized_difference(nir, red, eps)
 
 
 def create_ndsi(green: np.ndarray, swir1: np.ndarray, eps: float = 1e-7) -> np.ndarray:
-    return (green - swir1) / (green + swir1 + eps)
+    return normalized_difference(green, swir1, eps)
 
 
 def create_ndbi(swir1: np.ndarray, nir: np.ndarray, eps: float = 1e-7) -> np.ndarray:
-    return (swir1 - nir) / (swir1 + nir + eps)
+    return normalized_difference(swir1, nir, eps)
+
+
+def create_composites(
+    red: np.ndarray,
+    green: np.ndarray,
+    nir: np.ndarray,
+    swir1: np.ndarray,
+    eps: float = 1e-7,
+    block_rows: int = 32,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Create `ndvi`, `ndsi`, and `ndbi` in a single pass over the shared bands
+
+    Rows are processed in blocks of `block_rows`, so each block of a band is
+    read from memory once and reused from cache by every composite using it
+    """
+
+    ndvi: np.ndarray = np.empty(red.shape, dtype=np.float32)
+    ndsi: np.ndarray = np.empty(red.shape, dtype=np.float32)
+    ndbi: np.ndarray = np.empty(red.shape, dtype=np.float32)
+
+    scratch: np.ndarray = np.empty((block_rows, *red.shape[1:]), dtype=np.float32)
+
+    for start in range(0, red.shape[0], block_rows):
+        rows: slice = slice(start, start + block_rows)
+
+        red_block: np.ndarray = red[rows].astype(np.float32, copy=False)
+        green_block: np.ndarray = green[rows].astype(np.float32, copy=False)
+        nir_block: np.ndarray = nir[rows].astype(np.float32, copy=False)
+        swir1_block: np.ndarray = swir1[rows].astype(np.float32, copy=False)
+
+        block_scratch: np.ndarray = scratch[: red_block.shape[0]]
+
+        normalized_difference(
+            nir_block, red_block, eps, out=ndvi[rows], scratch=block_scratch
+        )
+        normalized_difference(
+            green_block, swir1_block, eps, out=ndsi[rows], scratch=block_scratch
+        )
+        normalized_difference(
+            swir1_block, nir_block, eps, out=ndbi[rows], scratch=block_scratch
+        )
+
+    return ndvi, ndsi, ndbi
 
 
 def create_cdi(
@@ -21,19 +89,24 @@ def create_cdi(
     window_size: int = 7,
     eps: float = 1e-7,
 ) -> np.ndarray:
+    """Cloud displacement index (Frantz et al. 2018) of Sentinel 2 bands
 
-    ratio_b8_b8a: np.ndarray = nir / (nir2 + eps)
-    ratio_b7_b8a: np.ndarray = red3 / (nir2 + eps)
+    Both ratios are filtered as one stack and their variances are combined
+    in place, pixels with zero total variance are 0
+    """
 
-    variance_b8_b8a = focal_variance(ratio_b8_b8a, window_size=window_size)
-    variance_b7_b8a = focal_variance(ratio_b7_b8a, window_size=window_size)
+    ratios: np.ndarray = np.empty((2, *nir.shape), dtype=np.float32)
+    nir2_eps: np.ndarray = nir2 + eps
+    np.divide(nir, nir2_eps, out=ratios[0])
+    np.divide(red3, nir2_eps, out=ratios[1])
 
-    cdi = np.zeros(variance_b8_b8a.shape, dtype=np.float32)
+    variance_b8_b8a, variance_b7_b8a = focal_variance(ratios, window_size=window_size)
 
-    mask_non_zero = (variance_b7_b8a + variance_b8_b8a) != 0
+    total: np.ndarray = np.add(variance_b7_b8a, variance_b8_b8a)
+    mask_non_zero: np.ndarray = total != 0
 
-    cdi[mask_non_zero] = (
-        variance_b7_b8a[mask_non_zero] - variance_b8_b8a[mask_non_zero]
-    ) / (variance_b7_b8a[mask_non_zero] + variance_b8_b8a[mask_non_zero])
+    cdi: np.ndarray = np.zeros(total.shape, dtype=np.float32)
+    np.subtract(variance_b7_b8a, variance_b8_b8a, out=cdi, where=mask_non_zero)
+    np.divide(cdi, total, out=cdi, where=mask_non_zero)
 
     return cdi
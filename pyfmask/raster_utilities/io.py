@@ -1,3 +1,8 @@
+from contextlib import contextmanager
+from typing import Final
+from typing import Iterator
+from typing import List
+from typing import Optional
 from typing import Union
 
 import numpy as np
@@ -12,6 +17,36 @@ except ImportError:
     from osgeo.gdal import Dataset
 
 
+TILE_SIZE: Final[int] = 512
+TILED_OUTFILE_OPTIONS: Final[List[str]] = [
+    "TILED=YES",
+    f"BLOCKXSIZE={TILE_SIZE}",
+    f"BLOCKYSIZE={TILE_SIZE}",
+    "COMPRESS=DEFLATE",
+    "PREDICTOR=2",
+    "NUM_THREADS=ALL_CPUS",
+]
+
+
+@contextmanager
+def gdal_num_threads(num_threads: str = "ALL_CPUS") -> Iterator[None]:
+    """Set `GDAL_NUM_THREADS` for GDAL calls made on this thread within the block
+
+    Scoped to the thread so host applications keep their own GDAL config.
+    A value already configured by the caller or the environment is left as is
+    """
+
+    if gdal.GetConfigOption("GDAL_NUM_THREADS") is not None:
+        yield
+        return
+
+    gdal.SetThreadLocalConfigOption("GDAL_NUM_THREADS", num_threads)
+    try:
+        yield
+    finally:
+        gdal.SetThreadLocalConfigOption("GDAL_NUM_THREADS", None)
+
+
 def create_outfile_dataset(
     file_path: str,
     x_size: int,
@@ -21,7 +56,7 @@ def create_outfile_dataset(
     number_bands: int,
     driver: str = "GTiff",
     data_type=gdalconst.GDT_Int16,
-    outfile_options: list = ["COMPRESS=DEFLATE"],
+    outfile_options: Optional[List[str]] = None,
 ) -> Dataset:
     """Creates outfile dataset
 
@@ -46,8 +81,8 @@ def create_outfile_dataset(
         Outfile driver type. Default `GTiff`
     data_type : gdalconst.*
         Outfile data type. Default gdalconst.GDT_Int16
-    outfile_options : list
-        List of GDAL outfile options. Default ['COMPRESS=DEFLATE']
+    outfile_options : Optional[List[str]]
+        List of GDAL outfile options. Default None uses `TILED_OUTFILE_OPTIONS`
 
     Returns
     -------
@@ -61,7 +96,12 @@ def create_outfile_dataset(
 
     # Create outfile dataset
     ds = gdal_driver.Create(
-        file_path, x_size, y_size, number_bands, data_type, outfile_options
+        file_path,
+        x_size,
+        y_size,
+        number_bands,
+        data_type,
+        outfile_options if outfile_options is not None else TILED_OUTFILE_OPTIONS,
     )
 
     # Confirm successful `ds` creation
@@ -78,11 +118,16 @@ def create_outfile_dataset(
 
 
 def write_array_to_ds(
-    ds: Dataset, array: np.ndarray, band: int = 1, no_data_value: int = -9999
+    ds: Dataset,
+    array: np.ndarray,
+    band: int = 1,
+    no_data_value: int = -9999,
+    block_size: Optional[int] = None,
 ) -> Dataset:
     """Writes NumPy array to GDAL Dataset band
 
-    Uses GDAL to write `array` to `ds` `band` using given metadata parameters
+    Uses GDAL to write `array` to `ds` `band` using given metadata parameters.
+    If `block_size` is given, `array` is written in strips of that many rows
 
     Parameters
     ----------
@@ -94,6 +139,9 @@ def write_array_to_ds(
         Target DS band to write `array`
     no_data_value : int
         No data value for `band`. Default -9999
+    block_size : Optional[int]
+        Rows per written strip, ideally the dataset tile height. Default None
+        writes `array` whole
 
     Returns
     -------
@@ -114,9 +162,16 @@ def write_array_to_ds(
         raise ValueError(f"target band {band} is outside `ds` band scope")
 
     # Write `array` to outfile dataset
-    ds.GetRasterBand(band).WriteArray(array)
+    raster_band = ds.GetRasterBand(band)
+    if block_size is None:
+        raster_band.WriteArray(array)
+    else:
+        # Full-width strips one tile row high cover whole tiles, so each
+        # tile is compressed and written exactly once
+        for y_offset in range(0, array.shape[0], block_size):
+            raster_band.WriteArray(array[y_offset : y_offset + block_size], 0, y_offset)
 
     # Set outfile `no_data_value`
-    ds.GetRasterBand(band).SetNoDataValue(no_data_value)
+    raster_band.SetNoDataValue(no_data_value)
 
     return ds
@@ -1,47 +1,252 @@
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable
 from typing import List
 from typing import Optional
 from typing import Union
 
 import numpy as np
-from scipy import signal
+from scipy.ndimage import maximum_filter1d
 from scipy.ndimage import uniform_filter
 from skimage import morphology
 from skimage.measure import label
 
 
-def dilate_array(array: np.ndarray, amount: Union[float, int]) -> np.ndarray:
-    return morphology.binary_dilation(
-        array.astype(bool), morphology.square(2 * amount + 1)
+def apply_per_tile(
+    func: Callable[[np.ndarray], np.ndarray],
+    array: np.ndarray,
+    out: np.ndarray,
+    overlap: int,
+    tile: int = 2048,
+    max_workers: Optional[int] = None,
+) -> np.ndarray:
+    """Apply `func` to tiles of `tile` rows of `array` in threads, into `out`
+
+    Rows are the second to last axis. Each tile is read with `overlap` rows
+    of halo on both sides, so a `func` reaching at most `overlap` rows gives
+    the same result as on the whole array. SciPy and NumPy release the GIL,
+    so tiles run concurrently. `out` must not share memory with `array`
+    """
+
+    rows_count: int = array.shape[-2]
+
+    def apply_tile(start: int) -> None:
+        end: int = min(start + tile, rows_count)
+        low: int = max(start - overlap, 0)
+        high: int = min(end + overlap, rows_count)
+
+        tile_result: np.ndarray = func(array[..., low:high, :])
+        out[..., start:end, :] = tile_result[..., start - low : end - low, :]
+
+    starts: range = range(0, rows_count, tile)
+    if len(starts) <= 1:
+        out[...] = func(array)
+        return out
+
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        for future in [executor.submit(apply_tile, start) for start in starts]:
+            future.result()
+
+    return out
+
+
+def _square_dilation_tile(mask: np.ndarray, size: int) -> np.ndarray:
+    dilated: np.ndarray = maximum_filter1d(mask, size, axis=-2, mode="constant", cval=0)
+    maximum_filter1d(dilated, size, axis=-1, output=dilated, mode="constant", cval=0)
+
+    return dilated
+
+
+def _square_dilation(
+    mask: np.ndarray, amount: int, max_workers: Optional[int] = None
+) -> np.ndarray:
+    """Dilate the last two axes of boolean `mask` with a square structuring element
+
+    Uses two separable 1-D maximum filters (van Herk / Gil-Werman), so the
+    cost per pixel does not depend on `amount`. Tiles are dilated concurrently
+    by up to `max_workers` threads
+    """
+
+    source: np.ndarray = np.ascontiguousarray(mask).view(np.uint8)
+
+    dilated: np.ndarray = apply_per_tile(
+        partial(_square_dilation_tile, size=2 * amount + 1),
+        source,
+        np.empty(source.shape, dtype=np.uint8),
+        overlap=amount,
+        max_workers=max_workers,
     )
 
+    return dilated.view(bool)
+
+
+def _disk_dilation_tile(mask: np.ndarray, radius: int) -> np.ndarray:
+    """Dilate boolean `mask` by `skimage.morphology.disk(radius)`
+
+    The disk is decomposed into its rows, horizontal lines that are grown
+    from the narrowest one with shifted ORs and ORed in at their row offsets
+    """
+
+    source: np.ndarray = np.ascontiguousarray(mask, dtype=bool)
+    line: np.ndarray = source.copy()
+    dilated: np.ndarray = np.zeros(source.shape, dtype=bool)
+
+    width: int = 0
+    for offset in range(radius, -1, -1):
+        half_width: int = math.isqrt(radius * radius - offset * offset)
+
+        for width in range(width + 1, half_width + 1):
+            line[:, width:] |= source[:, :-width]
+            line[:, :-width] |= source[:, width:]
+        width = half_width
+
+        if offset == 0:
+            dilated |= line
+        else:
+            dilated[:-offset] |= line[offset:]
+            dilated[offset:] |= line[:-offset]
+
+    return dilated
+
+
+def _disk_dilation(
+    mask: np.ndarray, radius: int, max_workers: Optional[int] = None
+) -> np.ndarray:
+    """Dilate boolean `mask` by `skimage.morphology.disk(radius)`
+
+    Tiles are dilated concurrently by up to `max_workers` threads
+    """
+
+    source: np.ndarray = np.ascontiguousarray(mask, dtype=bool)
+
+    return apply_per_tile(
+        partial(_disk_dilation_tile, radius=radius),
+        source,
+        np.empty(source.shape, dtype=bool),
+        overlap=radius,
+        max_workers=max_workers,
+    )
+
+
+def dilate_array(
+    array: np.ndarray, amount: Union[float, int], max_workers: Optional[int] = None
+) -> np.ndarray:
+    """Dilate `array` with a square structuring element of radius `amount`
+
+    Up to `max_workers` threads are used, default None (CPU count)
+    """
+
+    return _square_dilation(
+        array.astype(bool, copy=False), int(amount), max_workers=max_workers
+    )
+
+
+def dilate_arrays(
+    arrays: List[np.ndarray],
+    amount: Union[float, int],
+    max_workers: Optional[int] = None,
+) -> List[np.ndarray]:
+    """Dilate each of the equally shaped `arrays` by radius `amount`
+
+    The arrays are dilated in a single sweep over their stack by up to
+    `max_workers` threads, default None (CPU count)
+    """
+
+    if len(arrays) == 1:
+        return [dilate_array(arrays[0], amount, max_workers=max_workers)]
+
+    stack: np.ndarray = np.stack([array.astype(bool, copy=False) for array in arrays])
+
+    return list(_square_dilation(stack, int(amount), max_workers=max_workers))
+
 
 def focal_variance(array: np.ndarray, window_size: int = 7) -> np.ndarray:
+    """Variance of the `window_size` square window around each pixel
+
+    Only the last two axes are filtered, so a stack of rasters
+    is filtered in a single call
+    """
+
+    size: tuple = (1,) * (array.ndim - 2) + (window_size, window_size)
 
     img32: np.ndarray = array.astype(np.float32)
-    focal_mean = uniform_filter(img32, size=window_size, mode="constant", cval=0)
-    mean_square = uniform_filter(img32 ** 2, size=window_size, mode="constant", cval=0)
-    variance = mean_square - focal_mean * focal_mean
+    focal_mean = uniform_filter(img32, size=size, mode="constant", cval=0)
+    np.square(img32, out=img32)
+    variance = uniform_filter(img32, size=size, mode="constant", cval=0)
+
+    np.multiply(focal_mean, focal_mean, out=focal_mean)
+    variance -= focal_mean
 
     return variance
 
 
-def enhance_line(array: np.ndarray) -> np.ndarray:
-    """Enhance line array"""
+def enhance_line(
+    array: np.ndarray, out: Optional[np.ndarray] = None, block_rows: int = 64
+) -> np.ndarray:
+    """Enhance line array
+
+    Maximum response of the four 3 x 3 line templates, a line weighted 2 and
+    the rest of the window -1, over 6. Each is three times a line sum minus
+    the window sum, so the responses are built from shared sums of each
+    block of `block_rows` rows in one pass.
+    If given, the result is written to float32 `out`, which may be `array`
+    """
+
+    array = array.astype(np.float32, copy=False)
+    rows_count: int = array.shape[0]
+
+    array_result: np.ndarray = (
+        np.empty(array.shape, dtype=np.float32) if out is None else out
+    )
+
+    ##
+    # Block rows with a zero border, summed in float64 like the convolutions
+    # were. The last row of a block is kept as the top border of the next,
+    # so rows of `array` are read before `out` overwrites them
+    ##
+    padded: np.ndarray = np.zeros(
+        (block_rows + 2, array.shape[1] + 2), dtype=np.float64
+    )
+
+    for start in range(0, rows_count, block_rows):
+        end: int = min(start + block_rows, rows_count)
+        block: np.ndarray = padded[: end - start + 2]
+
+        if start > 0:
+            block[0] = padded[block_rows]
+        block[1:-1, 1:-1] = array[start:end]
+        block[-1, 1:-1] = array[end] if end < rows_count else 0
+
+        centre: np.ndarray = block[1:-1, 1:-1]
 
-    template: List[np.ndarray] = []
-    template.append(np.array([[-1, -1, -1], [2, 2, 2], [-1, -1, -1]]) / 6.0)
+        row_sums: np.ndarray = block[:, :-2] + block[:, 1:-1]
+        row_sums += block[:, 2:]
 
-    template.append(np.array([[-1, 2, -1], [-1, 2, -1], [-1, 2, -1]]) / 6.0)
+        window_sums: np.ndarray = row_sums[:-2] + row_sums[1:-1]
+        window_sums += row_sums[2:]
 
-    template.append(np.array([[2, -1, -1], [-1, 2, -1], [-1, -1, 2]]) / 6.0)
+        ##
+        # Maximum of the row, column and both diagonal line sums
+        ##
+        line_sums: np.ndarray = block[:-2, 1:-1] + centre
+        line_sums += block[2:, 1:-1]
+        np.maximum(line_sums, row_sums[1:-1], out=line_sums)
 
-    template.append(np.array([[-1, -1, 2], [-1, 2, -1], [2, -1, -1]]) / 6.0)
+        diagonal_sums: np.ndarray = block[:-2, :-2] + centre
+        diagonal_sums += block[2:, 2:]
+        np.maximum(line_sums, diagonal_sums, out=line_sums)
 
-    array_result: np.ndarray = -9999999 * np.ones(array.shape).astype(np.float32)
+        np.add(block[:-2, 2:], centre, out=diagonal_sums)
+        diagonal_sums += block[2:, :-2]
+        np.maximum(line_sums, diagonal_sums, out=line_sums)
 
-    for k in template:
-        tmp = signal.convolve2d(array, k, mode="same", boundary="fill", fillvalue=0)
-        array_result = np.maximum(array_result, tmp)
+        line_sums *= 3
+        line_sums -= window_sums
+        line_sums /= 6
+
+        array_result[start:end] = line_sums
 
     return array_result
 
@@ -55,96 +260,82 @@ def erode_commissons(
 ) -> np.ndarray:
     """Erode pixels representing cloud comission errors"""
 
-    cloud: np.ndarray = np.where(potential_clouds > 0, True, False)
+    cloud: np.ndarray = potential_clouds > 0
 
     ##
-    # Erode potential false cloud pixels
+    # Erode potential false cloud pixels, pixels lost to erosion are
+    # those within `erode_pixels` of clear pixels
     ##
-    clouds_after_erosion: np.ndarray = morphology.binary_erosion(
-        cloud, morphology.disk(erode_pixels)
-    )
-    pixels_eroded: np.ndarray = (clouds_after_erosion == False) & (
-        potential_false_positives == True
-    )
+    pixels_eroded: np.ndarray = _disk_dilation(~cloud, erode_pixels)
+    pixels_eroded &= potential_false_positives
 
     ##
     # Remove `potential_false_positive` pixels
     ##
-    clouds_after_erosion = np.array(cloud, copy=True)  # must deep copy
-    clouds_after_erosion = np.where(pixels_eroded == True, 0, clouds_after_erosion)
+    clouds_after_erosion: np.ndarray = np.logical_not(pixels_eroded, out=pixels_eroded)
+    clouds_after_erosion &= cloud
 
     ##
     # Dilate to orginal cloud shape
     ##
-    clouds_redilated: np.ndarray = morphology.binary_dilation(
-        clouds_after_erosion, morphology.disk(2 * erode_pixels)
+    clouds_redilated: np.ndarray = _disk_dilation(
+        clouds_after_erosion, 2 * erode_pixels
     )
 
     # Remover the clouds gone forever
     # Segmentate each cloud to remove the small objs
-    cloud_labels: np.ndarray = label(
-        cloud, connectivity=2
+    cloud_labels: np.ndarray
+    cloud_count: int
+    cloud_labels, cloud_count = label(
+        cloud, connectivity=2, return_num=True
     )  # corresponds to connectivity 8
-    clouds_remaining = np.array(cloud_labels, copy=True)
-    clouds_remaining = np.where(
-        clouds_after_erosion == False, 0, clouds_remaining
-    )  # remove the clouds gone.
-    idx_clouds_remaining = np.unique(clouds_remaining)
-
-    cloud_remaining = np.zeros(
-        cloud.shape, dtype=bool
-    )  # the clouds needed to be eroded.
-    if np.size(idx_clouds_remaining) > 0:
-        idx_clouds_remaining = np.delete(
-            idx_clouds_remaining, np.where(idx_clouds_remaining == 0)
-        )
-
-        if np.size(idx_clouds_remaining) > 0:
-            cloud_remaining = np.isin(cloud_labels, idx_clouds_remaining)
+
+    ##
+    # Clouds with pixels left after erosion, as a lookup by label
+    ##
+    labels_remaining: np.ndarray = np.zeros(cloud_count + 1, dtype=bool)
+    labels_remaining[cloud_labels[clouds_after_erosion]] = True
+    labels_remaining[0] = False
+
+    cloud_remaining: np.ndarray = labels_remaining[cloud_labels]
 
     # only for land
-    cloud = ((clouds_redilated == True) & (cloud_remaining == True)) | (
-        (water == True) & (cloud == True)
-    )  # add clouds over water
+    cloud_remaining &= clouds_redilated
+
+    # add clouds over water
+    cloud &= water
+    cloud |= cloud_remaining
 
     if cdi is None:
-        cloud = morphology.remove_small_objects(cloud.astype(bool), 3, connectivity=2)
+        cloud = morphology.remove_small_objects(cloud, 3, connectivity=2)
         return cloud  # if not Sentinel-2
 
     ##
     # Remove small object with CDI < -0.5, only for Sentinel 2
     ##
-    large_objects: np.ndarray = morphology.remove_small_objects(
-        cloud.astype(bool), 10000, connectivity=2
-    )
+    object_labels: np.ndarray
+    object_count: int
+    object_labels, object_count = label(cloud, connectivity=2, return_num=True)
 
-    # invert `large_objects` to obtain small objects
-    small_objects: np.ndarray = (cloud == 1) & (large_objects == 0)
+    object_sizes: np.ndarray = np.bincount(object_labels.ravel())
 
-    # label small clouds
-    small_object_labels: np.ndarray = label(small_objects, connectivity=2)
-
-    # identify all cloud pixels below CDI threshold
-    confident_cloud_pixels: np.ndarray = cdi < -0.5
-
-    # remove non-confident cloud pixels
-    small_objects_excluding_urban: np.ndarray = np.array(small_object_labels, copy=True)
-    small_objects_excluding_urban[confident_cloud_pixels == 0] = 0
-
-    ##
-    # Identify `true_clouds` as areas where `confident_cloud_pixels` remain
-    idx = np.unique(small_objects_excluding_urban)
-    true_cloud = np.isin(small_object_labels, idx)
+    # small clouds are objects of less than 10000 pixels
+    small_objects: np.ndarray = object_sizes < 10000
+    small_objects[0] = False
 
     ##
-    # Remove bright surfaces
+    # Identify true clouds as objects with cloud pixels below CDI threshold
     ##
-    bright_surfaces = (true_cloud == 0) & (small_objects == 1)
-    cloud[bright_surfaces] = 0
+    true_cloud: np.ndarray = np.zeros(object_count + 1, dtype=bool)
+    true_cloud[object_labels[cdi < -0.5]] = True
 
     ##
-    # Remove very small objects
+    # Remove bright surfaces, small objects that are not true clouds, and
+    # very small objects. Objects are removed whole, so the remaining ones
+    # are still the connected clouds and no relabelling is needed
     ##
-    cloud = morphology.remove_small_objects(cloud.astype(bool), 3, connectivity=2)
+    removed_objects: np.ndarray = small_objects & ~true_cloud
+    removed_objects |= object_sizes < 3
+    cloud[removed_objects[object_labels]] = False
 
     return cloud
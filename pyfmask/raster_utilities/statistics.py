@@ -0,0 +1,58 @@
+from typing import Union
+
+import numpy as np
+
+
+def partition_percentile(
+    array: np.ndarray, q: Union[int, float], overwrite_input: bool = False
+) -> Union[int, float]:
+    """Linearly interpolated `q`th percentile of NaN free 1-D `array`
+
+    Matches `np.percentile(array, q)`. The array is partitioned around a
+    single index and the next value is the minimum of the upper partition,
+    which is faster than partitioning around both interpolation indices.
+    With `overwrite_input` `array` is partitioned in place
+    """
+
+    result_type: type = (
+        array.dtype.type if np.issubdtype(array.dtype, np.floating) else np.float64
+    )
+
+    if array.size == 0:
+        return result_type(np.nan)
+
+    position: float = q / 100 * (array.size - 1)
+    index: int = int(position)
+    fraction: float = position - index
+
+    partitioned: np.ndarray = array if overwrite_input else array.copy()
+    partitioned.partition(index)
+    low = result_type(partitioned[index])
+
+    if index + 1 == array.size:
+        return low
+
+    high = result_type(partitioned[index + 1 :].min())
+    difference = high - low
+
+    ##
+    # Same interpolation as `np.percentile`, from the closer side
+    ##
+    if fraction >= 0.5:
+        return high - difference * (1 - fraction)
+
+    return low + difference * fraction
+
+
+def masked_percentile(
+    array: np.ndarray, mask: np.ndarray, q: Union[int, float]
+) -> Union[int, float]:
+    """Linearly interpolated `q`th percentile of `array` where `mask` is True
+
+    Values are gathered with `np.compress`, which is faster than boolean
+    indexing, and partitioned in place
+    """
+
+    values: np.ndarray = np.compress(mask.ravel(), array.ravel())
+
+    return partition_percentile(values, q, overwrite_input=True)
@@ -1,4 +1,7 @@
+import os
 from pathlib import Path
+import stat
+from typing import Optional
 from typing import Union
 
 
@@ -11,16 +14,29 @@ def validate_path(
 
     valid_path: Path = Path(path) if isinstance(path, str) else path
 
+    if not (check_exists or check_is_file or check_is_dir):
+        return valid_path
+
+    ##
+    # Single `stat` call, checks read its mode bits. Paths that cannot be
+    # stat'ed do not exist, as for `Path.exists()`
+    ##
+    mode: Optional[int]
+    try:
+        mode = os.stat(valid_path).st_mode
+    except (OSError, ValueError):
+        mode = None
+
     if check_exists:
-        if not valid_path.exists():
+        if mode is None:
             raise FileExistsError(f"{path} must exist")
 
     if check_is_file:
-        if not valid_path.is_file():
+        if mode is None or not stat.S_ISREG(mode):
             raise FileNotFoundError(f"{path} must be a file")
 
     if check_is_dir:
-        if not valid_path.is_dir():
+        if mode is None or not stat.S_ISDIR(mode):
             raise ValueError(f"{path} must be a directory")
 
     return valid_path